@@ -1,13 +1,51 @@
 import streamlit as st
+import csv
+import io
 import json
+import sys
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
+import bisect
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+
+from tides import TideTable, check_tide_windows, datetime_strings_to_minutes, from_epoch_minutes, to_epoch_minutes, NO_TIDE
+from sheets_sync import GspreadBackend, SheetSync
+from routing import (HARBOR_COORDINATES, GridIndex, Stop, build_harbor_index, cluster_points, drop_off_offset_minutes,
+                     haversine_matrix, plan_day, service_minutes_for)
+
+try:
+    import fcntl
+except ImportError: # Windows: writers are only serialized within this process
+    fcntl = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError: # Parquet export is skipped; CSV still works
+    pa = pq = None
 
 # --- Configuration (same as before) ---
 CUSTOMER_DATA_FILE = 'customers.json'
 JOB_DATA_FILE = 'jobs.json'
 JOB_CSV_FILE = "boat_jobs.csv"
+JOURNAL_FILE = 'haulops.journal'
+JOURNAL_COMPACT_THRESHOLD = 500 # Journal records to accumulate before folding them into the JSON snapshots
+ARCHIVE_DIR = 'job_archive' # Closed jobs from past seasons, one JSON file per season plus manifest.json
+IMPORT_BATCH_SIZE = 1000 # Customers per journal write during bulk import
+EXPORT_CHUNK_ROWS = 5000 # Jobs per chunk written by the job export
+EXPORT_STATE_FILE = '.export_state.json' # Last export time per export file, for "changed since last export"
+SHEETS_CREDENTIALS_FILE = 'credentials.json'
+SHEETS_SPREADSHEET_KEY = os.environ.get('HAULOPS_SHEET_KEY', '') # Google Sheet mirrored from the app; empty = no sync
+SHEETS_SYNC_LOCK_FILE = '.sheets_sync.lock' # Held by the one app process that writes the sheet
+PAGE_SIZES = [25, 50, 100, 250] # Rows per page on the customer and job lists
+NEARBY_CUSTOMER_MILES = 2.0 # "Customers nearby" radius on the customer list
+BOAT_TYPES = ["Powerboat", "Sailboat MD", "Sailboat MT"] # MD = mast on deck, MT = mast transported by the crane truck
 DATETIME_FORMAT = "%Y-%m-%d %H:%M"
 
 # --- Helper Functions for Data Handling (same as before) ---
@@ -23,16 +61,237 @@ def load_data(file_path):
         st.error(f"Error loading data from {file_path}. Starting with empty data for this section.")
         return {}
 
+def file_size(file_path):
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
 def save_data(data, file_path):
+    # Write to a temp file and swap it in, so a crash mid-write never leaves a truncated JSON file behind
+    tmp_path = f"{file_path}.tmp"
     try:
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=4)
+        with open(tmp_path, 'w') as f:
+            # Compact one-shot dumps() runs on the C encoder; indent=/dump() fall back to the pure-Python one
+            f.write(json.dumps(data, separators=(',', ':')))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+        return True
     except IOError:
         st.error(f"Error: Could not save data to {file_path}")
+        return False
+
+# --- Journaled Storage ---
+# customers.json / jobs.json are snapshots. Every mutation after the last snapshot is appended to the
+# journal as one JSON line holding the full record, so replaying a record twice is harmless. Once the
+# journal grows past JOURNAL_COMPACT_THRESHOLD records it is folded back into the snapshots.
+# Several app processes may share the files: writers serialize on an flock'd lock file and catch up on
+# each other's journal records before appending their own.
+class JournaledStore:
+    def __init__(self, customer_file=CUSTOMER_DATA_FILE, job_file=JOB_DATA_FILE, journal_file=JOURNAL_FILE,
+                 compact_threshold=JOURNAL_COMPACT_THRESHOLD, archive_dir=ARCHIVE_DIR):
+        self.customer_file = customer_file
+        self.job_file = job_file
+        self.journal_file = journal_file
+        self.archive = JobArchive(archive_dir)
+        self.lock_file = f"{journal_file}.lock"
+        self.compact_threshold = compact_threshold
+        self.journal_records = 0
+        self.journal_offset = 0 # Bytes of the journal already applied
+        self.snapshot_version = None
+        self.bytes_read = 0    # Persistence I/O since startup, for the performance panel
+        self.bytes_written = 0
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_handle = None
+
+    @contextmanager
+    def lock(self):
+        """Exclusive across threads and (where fcntl exists) processes. Re-entrant."""
+        with self._thread_lock:
+            self._lock_depth += 1
+            try:
+                if self._lock_depth == 1 and fcntl is not None:
+                    self._lock_handle = open(self.lock_file, 'a')
+                    fcntl.flock(self._lock_handle, fcntl.LOCK_EX)
+                yield
+            finally:
+                if self._lock_depth == 1 and self._lock_handle is not None:
+                    fcntl.flock(self._lock_handle, fcntl.LOCK_UN)
+                    self._lock_handle.close()
+                    self._lock_handle = None
+                self._lock_depth -= 1
+
+    def _current_snapshot_version(self):
+        version = []
+        for file_path in (self.customer_file, self.job_file):
+            try:
+                version.append(os.stat(file_path).st_mtime_ns)
+            except OSError:
+                version.append(None)
+        version.append(self.archive.version()) # Archiving moves jobs out of jobs.json, so it counts as a snapshot change
+        return tuple(version)
+
+    def _journal_size(self):
+        return file_size(self.journal_file)
+
+    def io_bytes(self):
+        """(bytes read, bytes written) by this store and its archive since startup."""
+        return self.bytes_read + self.archive.bytes_read, self.bytes_written + self.archive.bytes_written
+
+    def load(self):
+        """Returns (customers_data, jobs_data): the snapshots with the journal replayed on top."""
+        with self.lock():
+            self.snapshot_version = self._current_snapshot_version()
+            data = {'customer': load_data(self.customer_file), 'job': load_data(self.job_file)}
+            self.bytes_read += file_size(self.customer_file) + file_size(self.job_file)
+            self.journal_offset = 0
+            self.journal_records = 0
+            for record in self._read_journal():
+                self._apply(data, record)
+                self.journal_records += 1
+        return data['customer'], data['job']
+
+    @staticmethod
+    def _apply(data, record):
+        bucket = data.get(record.get('kind'))
+        if bucket is None:
+            return
+        if record.get('op') == 'delete':
+            bucket.pop(record['id'], None)
+        else:
+            bucket[record['id']] = record['data']
+
+    def changed_on_disk(self):
+        """Cheap stat-only check for writes made by another process since we last synced."""
+        return (self._journal_size() != self.journal_offset or
+                self._current_snapshot_version() != self.snapshot_version)
+
+    def read_new_records(self):
+        """Journal records appended by other writers since our last read, or None when another
+        process compacted in the meantime and the caller must reload everything. Hold lock()."""
+        if (self._current_snapshot_version() != self.snapshot_version or
+                self._journal_size() < self.journal_offset):
+            return None
+        records = list(self._read_journal(self.journal_offset))
+        self.journal_records += len(records)
+        return records
+
+    def _read_journal(self, start=0):
+        # Caller holds lock(), so a partial final line is a torn write from a crash, not a writer mid-append
+        if not os.path.exists(self.journal_file):
+            return
+        good_offset = start
+        with open(self.journal_file, 'rb') as f:
+            f.seek(start)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break # Torn final write; dropped below
+                good_offset += len(line)
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+            torn = f.tell() != good_offset
+        if torn:
+            # Cut the partial record off so the next append starts on a clean line
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(good_offset)
+        self.bytes_read += good_offset - start
+        self.journal_offset = good_offset
+
+    def append(self, kind, record_id, data=None):
+        return self.append_many([(kind, record_id, data)])
+
+    def append_many(self, changes):
+        """Appends (kind, record_id, data) changes in a single write; data=None records a delete.
+        Hold lock() and be caught up (read_new_records) first. Returns False if they could not be written."""
+        lines = []
+        for kind, record_id, data in changes:
+            if data is None:
+                record = {'op': 'delete', 'kind': kind, 'id': record_id}
+            else:
+                record = {'op': 'put', 'kind': kind, 'id': record_id, 'data': data}
+            lines.append(json.dumps(record, separators=(',', ':')) + '\n')
+        if not lines:
+            return True
+        payload = ''.join(lines).encode('utf-8')
+        with self.lock():
+            try:
+                with open(self.journal_file, 'ab') as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+            except IOError:
+                # Cut off whatever part of the write landed, or the next record would be glued onto it
+                try:
+                    with open(self.journal_file, 'r+b') as f:
+                        f.truncate(self.journal_offset)
+                except IOError:
+                    pass
+                st.error(f"Error: Could not write to {self.journal_file}")
+                return False
+            self.journal_records += len(lines)
+            self.bytes_written += len(payload)
+            self.journal_offset += len(payload)
+        return True
+
+    def needs_compaction(self):
+        return self.journal_records >= self.compact_threshold
+
+    def compact(self, customers_data, jobs_data, archive_data=None):
+        """Writes fresh snapshots and clears the journal. archive_data (season -> {job_id: data}) is merged into
+        the archive first; if that fails those jobs stay in jobs.json instead. Returns (archive manifest, saved):
+        saved is False if a snapshot could not be written, in which case the journal is kept."""
+        # Archive, then snapshots: a crash in between leaves a job in both places (the live copy wins), never
+        # in neither. If we crash before the journal is cleared, replaying it is idempotent.
+        with self.lock():
+            manifest = self.archive.load_manifest()
+            if archive_data:
+                merged = {}
+                for season, season_jobs in archive_data.items():
+                    merged[season] = self.archive.load_season(season, manifest)
+                    merged[season].update(season_jobs)
+                if not self.archive.write_seasons(merged, manifest):
+                    manifest = self.archive.load_manifest()
+                    for season_jobs in archive_data.values():
+                        jobs_data.update(season_jobs)
+            # The journal is the only copy of everything since the last good snapshot: keep it unless both
+            # snapshots made it to disk. Replaying it over a half-written pair is harmless.
+            saved = save_data(customers_data, self.customer_file) and save_data(jobs_data, self.job_file)
+            self.bytes_written += file_size(self.customer_file) + file_size(self.job_file)
+            if not saved:
+                return manifest, False
+            self.snapshot_version = self._current_snapshot_version()
+            try:
+                with open(self.journal_file, 'w'):
+                    pass
+                self.journal_records = 0
+                self.journal_offset = 0
+            except IOError:
+                st.error(f"Error: Could not reset {self.journal_file}")
+        return manifest, True
+
+    def unarchive(self, season, job_ids):
+        """Drops jobs from their season's partition once the live copy has been journaled. Returns the manifest."""
+        with self.lock():
+            manifest = self.archive.load_manifest()
+            season_jobs = self.archive.load_season(season, manifest)
+            removed = [job_id for job_id in job_ids if season_jobs.pop(job_id, None) is not None]
+            if removed:
+                self.archive.write_seasons({season: season_jobs}, manifest)
+                self.snapshot_version = self._current_snapshot_version()
+        return manifest
 
 # --- Customer Class (mostly the same) ---
 class Customer:
-    def __init__(self, name, phone, email, address, boat_make, boat_model, boat_length, boat_name="", customer_id=None):
+    # Slots instead of a per-instance __dict__: a 100k-customer book is mostly these objects
+    __slots__ = ('customer_id', 'name', 'phone', 'email', 'address', 'boat_make', 'boat_model', 'boat_length', 'boat_name',
+                 'boat_draft', 'boat_type', 'home_latitude', 'home_longitude', 'is_ecm_boat', 'ramp')
+
+    def __init__(self, name, phone, email, address, boat_make, boat_model, boat_length, boat_name="", customer_id=None, boat_draft=None,
+                 boat_type=None, home_latitude=None, home_longitude=None, is_ecm_boat=False, ramp=""):
         self.customer_id = customer_id if customer_id else str(uuid.uuid4())
         self.name = name
         self.phone = phone
@@ -42,13 +301,42 @@ class Customer:
         self.boat_model = boat_model
         self.boat_length = boat_length
         self.boat_name = boat_name
+        self.boat_draft = float(boat_draft) if boat_draft not in (None, "") else None # ft; None = unknown
+        self.boat_type = boat_type
+        self.home_latitude = float(home_latitude) if home_latitude not in (None, "") else None
+        self.home_longitude = float(home_longitude) if home_longitude not in (None, "") else None
+        self.is_ecm_boat = bool(is_ecm_boat)
+        self.ramp = ramp # Usual launch/haul ramp, if known
+
+    @property
+    def home_coordinates(self):
+        if self.home_latitude is None or self.home_longitude is None:
+            return None
+        return (self.home_latitude, self.home_longitude)
 
     def to_dict(self):
-        return self.__dict__
+        return {field: getattr(self, field) for field in self.__slots__}
 
     @staticmethod
-    def from_dict(data):
-        return Customer(**data)
+    def from_saved_dict(data):
+        """Rebuilds a customer written by to_dict() without re-validating it. Only for our own snapshot and journal."""
+        customer = Customer.__new__(Customer)
+        customer.customer_id = data['customer_id']
+        customer.name = data['name']
+        customer.phone = data['phone']
+        customer.email = data['email']
+        customer.address = data['address']
+        customer.boat_make = sys.intern(data['boat_make']) if data['boat_make'] else data['boat_make']
+        customer.boat_model = data['boat_model']
+        customer.boat_length = data['boat_length']
+        customer.boat_name = data.get('boat_name', "")
+        customer.boat_draft = data.get('boat_draft')
+        customer.boat_type = sys.intern(data['boat_type']) if data.get('boat_type') else None
+        customer.home_latitude = data.get('home_latitude')
+        customer.home_longitude = data.get('home_longitude')
+        customer.is_ecm_boat = data.get('is_ecm_boat', False)
+        customer.ramp = sys.intern(data['ramp']) if data.get('ramp') else ""
+        return customer
 
     # __str__ is less used in Streamlit, but can be helpful for debugging or specific displays
     def __str__(self):
@@ -57,11 +345,16 @@ class Customer:
                 f"  Phone: {self.phone}\n"
                 f"  Email: {self.email}\n"
                 f"  Address: {self.address}\n"
-                f"  Boat: {self.boat_length}ft {self.boat_make} {self.boat_model} (Name: {self.boat_name if self.boat_name else 'N/A'})")
+                f"  Boat: {self.boat_length}ft {self.boat_make} {self.boat_model} (Name: {self.boat_name if self.boat_name else 'N/A'})\n"
+                f"  Type: {self.boat_type if self.boat_type else 'N/A'}, Draft: {f'{self.boat_draft}ft' if self.boat_draft is not None else 'N/A'}")
 
 # --- Job Class (mostly the same) ---
 class Job:
     VALID_STATUSES = ["Scheduled", "In Progress", "Completed", "Cancelled", "Invoiced", "Paid"]
+    ACTIVE_STATUSES = ["Scheduled", "In Progress"] # Still ahead of us on the calendar
+    CLOSED_STATUSES = ["Completed", "Cancelled", "Paid"] # Nothing left to do; archived once their season is over
+    __slots__ = ('job_id', 'customer_id', 'service_type', 'scheduled_datetime', 'origin_location', 'destination_location',
+                 'quoted_price', 'status', 'notes', 'created_at', 'updated_at')
 
     def __init__(self, customer_id, service_type, scheduled_datetime_str, origin_location, destination_location, quoted_price, notes="", job_id=None, status="Scheduled"):
         self.job_id = job_id if job_id else str(uuid.uuid4())
@@ -81,11 +374,26 @@ class Job:
         self.updated_at = self.created_at
 
     def to_dict(self):
-        return self.__dict__
+        return {field: getattr(self, field) for field in self.__slots__}
 
     @staticmethod
-    def from_dict(data):
-        return Job(**data)
+    def from_saved_dict(data):
+        """Rebuilds a job written by to_dict() without re-validating it: no strptime/strftime round trip.
+        Only for our own snapshot and journal."""
+        job = Job.__new__(Job)
+        job.job_id = data['job_id']
+        job.customer_id = data['customer_id']
+        # A handful of distinct values repeated across every job: keep one copy of each
+        job.service_type = sys.intern(data['service_type'])
+        job.scheduled_datetime = data['scheduled_datetime']
+        job.origin_location = sys.intern(data['origin_location'])
+        job.destination_location = sys.intern(data['destination_location'])
+        job.quoted_price = data['quoted_price']
+        job.status = sys.intern(data['status'])
+        job.notes = data['notes']
+        job.created_at = data['created_at']
+        job.updated_at = data.get('updated_at') or job.created_at
+        return job
 
     def update_status(self, new_status):
         if new_status in self.VALID_STATUSES:
@@ -94,25 +402,654 @@ class Job:
             return True
         return False
 
+# --- Search Index ---
+# Trigram index over distinct (field, lowercased value) pairs. Locations, service types and a customer's
+# name repeat across thousands of jobs, so each distinct value is indexed once and maps to the set of
+# record IDs carrying it. Queries intersect the trigram postings, confirm the substring on the few
+# surviving values, then fan out to record IDs.
+class SearchIndex:
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        self._grams = {}  # trigram -> set of value keys
+        self._values = {} # (field number, lowercased value) -> set of record IDs
+        self._docs = {}   # record ID -> tuple of value keys
+
+    def __len__(self):
+        return len(self._docs)
+
+    @staticmethod
+    def _trigrams(text):
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def add(self, doc_id, values):
+        """(Re)indexes a record; values line up with self.fields."""
+        self.remove(doc_id)
+        keys = []
+        for field_no, value in enumerate(values):
+            text = str(value).lower() if value else ''
+            if not text:
+                continue
+            key = (field_no, text)
+            holders = self._values.get(key)
+            if holders is None:
+                holders = self._values[key] = set()
+                for gram in self._trigrams(text):
+                    self._grams.setdefault(gram, set()).add(key)
+            holders.add(doc_id)
+            keys.append(key)
+        self._docs[doc_id] = tuple(keys)
+
+    def remove(self, doc_id):
+        for key in self._docs.pop(doc_id, ()):
+            holders = self._values[key]
+            holders.discard(doc_id)
+            if holders:
+                continue
+            del self._values[key]
+            for gram in self._trigrams(key[1]):
+                keys = self._grams[gram]
+                keys.discard(key)
+                if not keys:
+                    del self._grams[gram]
+
+    def search(self, query, fields=None, rank=True):
+        """IDs of records with `query` as a substring of any of `fields` (default: all), best match first."""
+        query = query.lower()
+        if not query:
+            return list(self._docs)
+        wanted = set(range(len(self.fields))) if fields is None else {self.fields.index(f) for f in fields}
+
+        if len(query) >= 3:
+            postings = []
+            for gram in self._trigrams(query):
+                keys = self._grams.get(gram)
+                if not keys:
+                    return []
+                postings.append(keys)
+            postings.sort(key=len)
+            candidates = postings[0].intersection(*postings[1:])
+        else:
+            candidates = self._values # Too short for trigrams; scan distinct values
+
+        scores = {}
+        for key in candidates:
+            field_no, text = key
+            if field_no not in wanted or query not in text:
+                continue
+            score = self._score(field_no, text, query)
+            for doc_id in self._values[key]:
+                if score > scores.get(doc_id, -1):
+                    scores[doc_id] = score
+        if not rank:
+            return list(scores)
+        return sorted(scores, key=scores.__getitem__, reverse=True)
+
+    def _score(self, field_no, text, query):
+        # Earlier fields weigh more; whole-value, prefix and word-start matches beat mid-word hits
+        score = (len(self.fields) - field_no) * 4
+        if text == query:
+            score += 3
+        elif text.startswith(query):
+            score += 2
+        elif f" {query}" in text:
+            score += 1
+        return score
+
+def _schedule_key(value):
+    # Schedule index keys are DATETIME_FORMAT strings; accept datetimes too
+    return value.strftime(DATETIME_FORMAT) if isinstance(value, datetime) else value
+
+CUSTOMER_SEARCH_FIELDS = ('name', 'email', 'phone', 'boat_make', 'boat_model', 'boat_name')
+JOB_SEARCH_FIELDS = ('customer_name', 'service_type', 'origin_location', 'destination_location', 'notes')
+
+def _customer_search_values(customer):
+    return [getattr(customer, f) for f in CUSTOMER_SEARCH_FIELDS]
+
+def _job_search_values(job, customer):
+    return [customer.name if customer else '', job.service_type, job.origin_location, job.destination_location, job.notes]
+
+HARBOR_INDEX = build_harbor_index()
+
+# An active job booked outside the usable tide window at its harbor
+TideConflict = namedtuple('TideConflict', ['harbor', 'high_tide', 'window_minutes', 'draft', 'suggested'])
+
+class TideConflicts:
+    """Dict-like job_id -> TideConflict over one check_tide_windows() pass. Rows stay in the result
+    arrays and only become TideConflict objects when a page actually displays them."""
+    def __init__(self, harbors, job_ids, codes, drafts, check):
+        self._harbors = harbors
+        self._codes = codes
+        self._drafts = drafts
+        self._check = check
+        infeasible = np.flatnonzero(~check['feasible']).tolist() if job_ids else []
+        self._rows = {job_ids[i]: i for i in infeasible}
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, job_id):
+        return job_id in self._rows
+
+    def get(self, job_id):
+        i = self._rows.get(job_id)
+        if i is None:
+            return None
+        draft = self._drafts[i]
+        return TideConflict(self._harbors[self._codes[i]], from_epoch_minutes(self._check['high_tide'][i]),
+                            int(self._check['window'][i]), None if np.isnan(draft) else draft,
+                            from_epoch_minutes(self._check['suggested'][i]))
+
+# --- Dashboard Metrics ---
+class JobMetrics:
+    """Running totals for the Home dashboard. The manager calls remove() before and add() after every
+    change to a job, so reading a figure never scans the jobs."""
+    def __init__(self):
+        self.status_counts = {status: 0 for status in Job.VALID_STATUSES}
+        self._revenue_cents = {status: 0 for status in Job.VALID_STATUSES} # Integer cents: no float drift
+        self.jobs_per_day = {}  # "YYYY-MM-DD" -> jobs on the calendar that day (cancelled jobs excluded)
+        self.jobs_per_week = {} # (ISO year, ISO week) -> same, per week
+        self._weeks = {}        # "YYYY-MM-DD" -> (ISO year, ISO week) memo
+
+    def add(self, job):
+        self._count(job, 1)
+
+    def remove(self, job):
+        self._count(job, -1)
+
+    def revenue(self, status):
+        """Quoted revenue of the jobs currently at `status`, in dollars."""
+        return self._revenue_cents.get(status, 0) / 100
+
+    def total_jobs(self):
+        return sum(self.status_counts.values())
+
+    def summary(self):
+        """Plain-JSON totals, as stored per season in the archive manifest."""
+        return {'status_counts': {s: n for s, n in self.status_counts.items() if n},
+                'revenue_cents': {s: c for s, c in self._revenue_cents.items() if c},
+                'jobs_per_day': dict(self.jobs_per_day)}
+
+    def add_summary(self, summary):
+        """Counts jobs that are only known through a summary() (archived seasons) without loading them."""
+        for status, count in summary.get('status_counts', {}).items():
+            if status in self.status_counts:
+                self.status_counts[status] += count
+        for status, cents in summary.get('revenue_cents', {}).items():
+            if status in self._revenue_cents:
+                self._revenue_cents[status] += cents
+        for day, count in summary.get('jobs_per_day', {}).items():
+            _bump(self.jobs_per_day, day, count)
+            _bump(self.jobs_per_week, self.week_of(day), count)
+
+    def week_of(self, day):
+        """(ISO year, ISO week) for a "YYYY-MM-DD" string or a date."""
+        day = day if isinstance(day, str) else day.strftime("%Y-%m-%d")
+        week = self._weeks.get(day)
+        if week is None:
+            week = self._weeks[day] = tuple(datetime.strptime(day, "%Y-%m-%d").isocalendar()[:2])
+        return week
+
+    def _count(self, job, delta):
+        if job.status in self.status_counts:
+            self.status_counts[job.status] += delta
+            self._revenue_cents[job.status] += delta * round(job.quoted_price * 100)
+        if job.status == "Cancelled":
+            return
+        day = job.scheduled_datetime[:10]
+        _bump(self.jobs_per_day, day, delta)
+        _bump(self.jobs_per_week, self.week_of(day), delta)
+
+def _bump(counts, key, delta):
+    # Keeps the tallies free of zero entries
+    count = counts.get(key, 0) + delta
+    if count:
+        counts[key] = count
+    else:
+        counts.pop(key, None)
+
+# --- Job Archive ---
+# At compaction, closed jobs from past seasons move out of jobs.json into one partition file per season, so
+# startup and saves only pay for the live workload. Partitions are read when a view asks for history; the
+# manifest keeps each season's JobMetrics summary so the dashboard totals never need them.
+ARCHIVE_MANIFEST_FILE = 'manifest.json'
+
+def job_season(job):
+    # Seasons are calendar years; DATETIME_FORMAT starts with the year
+    return job.scheduled_datetime[:4]
+
+class JobArchive:
+    def __init__(self, directory=ARCHIVE_DIR):
+        self.directory = directory
+        self.manifest_file = os.path.join(directory, ARCHIVE_MANIFEST_FILE)
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def version(self):
+        try:
+            return os.stat(self.manifest_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def load_manifest(self):
+        """season -> {'file', 'jobs', 'status_counts', 'revenue_cents', 'jobs_per_day'}"""
+        self.bytes_read += file_size(self.manifest_file)
+        return load_data(self.manifest_file)
+
+    def load_season(self, season, manifest=None):
+        entry = (manifest if manifest is not None else self.load_manifest()).get(season)
+        if not entry:
+            return {}
+        file_path = os.path.join(self.directory, entry['file'])
+        self.bytes_read += file_size(file_path)
+        return load_data(file_path)
+
+    def write_seasons(self, seasons, manifest):
+        """Replaces whole partitions (season -> {job_id: data}; empty removes it) and then the manifest, which
+        is updated in place. Hold the store lock. Returns False if a partition could not be written."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+        except OSError:
+            st.error(f"Error: Could not create {self.directory}")
+            return False
+        for season, season_jobs in seasons.items():
+            file_name = f"jobs_{season}.json"
+            file_path = os.path.join(self.directory, file_name)
+            if not season_jobs:
+                manifest.pop(season, None)
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    pass
+                continue
+            if not save_data(season_jobs, file_path):
+                return False
+            self.bytes_written += file_size(file_path)
+            metrics = JobMetrics()
+            for data in season_jobs.values():
+                metrics.add(Job.from_saved_dict(data))
+            manifest[season] = dict(metrics.summary(), file=file_name, jobs=len(season_jobs))
+        saved = save_data(manifest, self.manifest_file)
+        self.bytes_written += file_size(self.manifest_file)
+        return saved
+
 # --- Business Logic (BoatHaulingManager - modified to remove input() calls) ---
+# One manager is shared by every session, each rendering on its own thread. Writers hold the store lock for
+# the whole change and _state_lock while they touch the in-memory state; readers hold _state_lock while they
+# walk it and hand back lists, never live views.
 class BoatHaulingManager:
-    def __init__(self):
-        # Load data at initialization
-        self.customers_data = load_data(CUSTOMER_DATA_FILE)
-        self.jobs_data = load_data(JOB_DATA_FILE)
+    def __init__(self, store=None):
+        self.store = store if store else JournaledStore()
+        self.version = 0 # Bumped on every change so per-session views know when to recompute
+        self._tide_conflicts = (None, None) # (version, result) memo for tide_conflicts()
+        self.change_listeners = [] # listener(kind, record_id, record or None); kind None = everything reloaded
+        self._state_lock = threading.RLock()
+        self.customers, self.jobs = {}, {}
+        # The trigram indexes outlive reloads: _load only re-indexes records that differ from what's in memory
+        self.customer_index = SearchIndex(CUSTOMER_SEARCH_FIELDS)
+        self.job_index = SearchIndex(JOB_SEARCH_FIELDS)
+        self._load()
+
+    def _load(self):
+        # Load data (snapshot files plus any journaled changes); archived seasons only by their summaries.
+        # Everything is built off to the side and swapped in at the end, so sessions rendering meanwhile
+        # keep reading the previous state. On a reload (another process compacted), records equal to the
+        # ones in memory keep their objects and search index entries.
+        with self.store.lock():
+            customers_data, jobs_data = self.store.load()
+            archive_manifest = self.store.archive.load_manifest()
+        old_customers, old_jobs = self.customers, self.jobs
 
-        # Convert dicts to objects
-        self.customers = {cid: Customer.from_dict(cdata) for cid, cdata in self.customers_data.items()}
-        self.jobs = {jid: Job.from_dict(jdata) for jid, jdata in self.jobs_data.items()}
+        # Convert dicts to objects, freeing each raw dict as we go so the whole book is never held twice
+        customers, changed_customers, renamed = {}, [], []
+        for cid in list(customers_data):
+            data = customers_data.pop(cid)
+            customer = old_customers.get(cid)
+            if customer is None or customer.to_dict() != data:
+                if customer is not None and customer.name != data.get('name'):
+                    renamed.append(cid) # Their jobs are searchable by customer name
+                customer = Customer.from_saved_dict(data)
+                changed_customers.append(customer)
+            customers[customer.customer_id] = customer
+        jobs, changed_jobs = {}, []
+        for jid in list(jobs_data):
+            data = jobs_data.pop(jid)
+            job = old_jobs.get(jid)
+            if job is None or job.to_dict() != data:
+                job = self._job_from_saved(data, customers)
+                changed_jobs.append(job)
+            jobs[job.job_id] = job
+        indexes = self._build_indexes(customers, jobs, archive_manifest)
 
+        with self._state_lock:
+            for cid in old_customers.keys() - customers.keys():
+                self.customer_index.remove(cid)
+            for customer in changed_customers:
+                self.customer_index.add(customer.customer_id, _customer_search_values(customer))
+            for jid in old_jobs.keys() - jobs.keys():
+                self.job_index.remove(jid)
+            jobs_by_customer = indexes[0]
+            changed_jobs.extend(job for cid in renamed for job in jobs_by_customer.get(cid, {}).values())
+            for job in changed_jobs:
+                self.job_index.add(job.job_id, _job_search_values(job, customers.get(job.customer_id)))
+
+            self.customers, self.jobs, self.archive_manifest = customers, jobs, archive_manifest
+            self.jobs_by_customer, self.customer_locations, self.metrics, self.schedule = indexes
+            self._archived_ids = set()    # Jobs read from an archive partition and unchanged since
+            self._loaded_seasons = set()  # Archive partitions read into memory
+            self.version += 1
+        self._notify(None, None, None)
+
+    @staticmethod
+    def _build_indexes(customers, jobs, archive_manifest):
+        # Everything but the search indexes; these are cheap to build from scratch
+        # customer_id -> {job_id: job}
+        jobs_by_customer = {}
+        # Customers with home coordinates, for proximity queries
+        customer_locations = GridIndex()
+        metrics = JobMetrics()
+        for summary in archive_manifest.values():
+            metrics.add_summary(summary)
+        # (scheduled_datetime, job_id), ascending. DATETIME_FORMAT is zero-padded largest-unit-first,
+        # so the stored strings already sort chronologically and never need strptime to order them.
+        schedule = sorted((job.scheduled_datetime, job.job_id) for job in jobs.values())
+        for customer in customers.values():
+            if customer.home_coordinates:
+                customer_locations.insert(customer.customer_id, *customer.home_coordinates)
+        for job in jobs.values():
+            metrics.add(job)
+            jobs_by_customer.setdefault(job.customer_id, {})[job.job_id] = job
+        return jobs_by_customer, customer_locations, metrics, schedule
+
+    def _job_from_saved(self, data, customers=None):
+        job = Job.from_saved_dict(data)
+        # Share the customer's ID string rather than keeping a copy per job
+        customer = (customers if customers is not None else self.customers).get(job.customer_id)
+        if customer is not None:
+            job.customer_id = customer.customer_id
+        return job
+
+    # --- Index maintenance: every change to customers/jobs goes through these, under _state_lock ---
+    def _index_customer(self, customer):
+        self.customer_index.add(customer.customer_id, _customer_search_values(customer))
+        if customer.home_coordinates:
+            self.customer_locations.insert(customer.customer_id, *customer.home_coordinates)
+        else:
+            self.customer_locations.remove(customer.customer_id)
+
+    def _index_job(self, job):
+        self.job_index.add(job.job_id, _job_search_values(job, self.customers.get(job.customer_id)))
+
+    def _notify(self, kind, record_id, record):
+        for listener in self.change_listeners:
+            listener(kind, record_id, record)
+
+    def _put_customer(self, customer):
+        with self._state_lock:
+            previous = self.customers.get(customer.customer_id)
+            self.customers[customer.customer_id] = customer
+            self._index_customer(customer)
+            self._notify('customer', customer.customer_id, customer)
+            if previous is not None and previous.name != customer.name:
+                # Jobs are searchable by customer name
+                for job in self.jobs_by_customer.get(customer.customer_id, {}).values():
+                    self._index_job(job)
+
+    def _drop_customer(self, customer_id):
+        with self._state_lock:
+            if self.customers.pop(customer_id, None) is not None:
+                self.customer_index.remove(customer_id)
+                self.customer_locations.remove(customer_id)
+                self._notify('customer', customer_id, None)
+
+    def _put_job(self, job):
+        # A changed archived job counts as live again; its old copy was in the season summary, and
+        # _unlink_job takes it out of the metrics below
+        with self._state_lock:
+            self._archived_ids.discard(job.job_id)
+            self._unlink_job(self.jobs.get(job.job_id))
+            self.jobs[job.job_id] = job
+            self._index_job(job)
+            self.metrics.add(job)
+            self.jobs_by_customer.setdefault(job.customer_id, {})[job.job_id] = job
+            bisect.insort(self.schedule, (job.scheduled_datetime, job.job_id))
+            self._notify('job', job.job_id, job)
+
+    def _drop_job(self, job_id):
+        with self._state_lock:
+            job = self.jobs.pop(job_id, None)
+            if job is not None:
+                self._archived_ids.discard(job_id)
+                self._unlink_job(job)
+                self.job_index.remove(job_id)
+                self._notify('job', job_id, None)
+
+    def _unlink_job(self, job):
+        # Removes a job's customer, schedule and metrics entries (the search index re-adds in place)
+        if job is None:
+            return
+        self.metrics.remove(job)
+        customer_jobs = self.jobs_by_customer.get(job.customer_id)
+        if customer_jobs is not None:
+            customer_jobs.pop(job.job_id, None)
+            if not customer_jobs:
+                del self.jobs_by_customer[job.customer_id]
+        entry = (job.scheduled_datetime, job.job_id)
+        pos = bisect.bisect_left(self.schedule, entry)
+        if pos < len(self.schedule) and self.schedule[pos] == entry:
+            del self.schedule[pos]
+
+    def refresh(self):
+        # Picks up changes written by other app processes; a stat() when nothing changed
+        if self.store.changed_on_disk():
+            with self.store.lock():
+                self._catch_up()
+
+    def _catch_up(self):
+        # Caller holds the store lock
+        records = self.store.read_new_records()
+        if records is None:
+            self._load()
+            return
+        for record in records:
+            self._apply_record(record)
+        if records:
+            self.version += 1
+
+    def _apply_record(self, record):
+        kind, deleted = record.get('kind'), record.get('op') == 'delete'
+        if kind == 'customer':
+            if deleted:
+                self._drop_customer(record['id'])
+            else:
+                self._put_customer(Customer.from_saved_dict(record['data']))
+        elif kind == 'job':
+            if deleted:
+                self._drop_job(record['id'])
+            else:
+                self._put_job(Job.from_saved_dict(record['data']))
+
+    # Mutations are journaled one record at a time instead of rewriting every customer and job.
+    # Each one first catches up on other writers' records under the lock, so nobody's change is lost.
+    # Each returns False, with the in-memory change undone, if it could not be journaled.
+    def add_customer(self, customer):
+        with self.store.lock():
+            self._catch_up()
+            self._put_customer(customer)
+            if not self._persist([('customer', customer.customer_id, customer.to_dict())]):
+                self._drop_customer(customer.customer_id)
+                return False
+        return True
+
+    def add_customers(self, customers):
+        # Bulk path: one lock, one catch-up and one journal write (one fsync) for the whole batch.
+        # Compaction is left to the caller so a long import doesn't rewrite the snapshots every batch.
+        with self.store.lock():
+            self._catch_up()
+            for customer in customers:
+                self._put_customer(customer)
+            if not self._persist([('customer', c.customer_id, c.to_dict()) for c in customers], deferred=True):
+                for customer in customers:
+                    self._drop_customer(customer.customer_id)
+                return False
+        return True
+
+    def add_job(self, job):
+        with self.store.lock():
+            self._catch_up()
+            self._put_job(job)
+            if not self._persist([('job', job.job_id, job.to_dict())]):
+                self._drop_job(job.job_id)
+                return False
+        return True
+
+    def update_job_status(self, job, new_status):
+        with self.store.lock():
+            self._catch_up()
+            job = self.jobs.get(job.job_id, job) # Another writer may have replaced our copy
+            if new_status not in Job.VALID_STATUSES:
+                return False
+            previous = (job.status, job.updated_at)
+            self._set_status(job, new_status)
+            changes = [('job', job.job_id, job.to_dict())]
+            if job.job_id in self._archived_ids:
+                # Edited history goes back to the live set until the next compaction re-archives it.
+                # Journal first: a crash before the partition rewrite leaves a duplicate, never a loss.
+                if not self.store.append_many(changes):
+                    self._set_status(job, *previous)
+                    return False
+                self._archived_ids.discard(job.job_id)
+                self.archive_manifest = self.store.unarchive(job_season(job), [job.job_id])
+                changes = []
+            if not self._persist(changes):
+                self._set_status(job, *previous)
+                return False
+        return True
+
+    def _set_status(self, job, status, updated_at=None):
+        # update_status() stamps updated_at; an explicit updated_at puts back an earlier state
+        with self._state_lock:
+            tracked = self.jobs.get(job.job_id) is job
+            if tracked:
+                self.metrics.remove(job)
+            if updated_at is None:
+                job.update_status(status)
+            else:
+                job.status, job.updated_at = status, updated_at
+            if tracked:
+                self.metrics.add(job)
+                self._notify('job', job.job_id, job)
+
+    def _persist(self, changes, deferred=False):
+        """Journals changes already made in memory. Returns False (the store has reported it) if that failed."""
+        self.version += 1
+        if not self.store.append_many(changes):
+            return False
+        if deferred:
+            return True
+        if self.store.needs_compaction():
+            self.save_all() # Reports its own outcome; the changes are safe in the journal either way
+        else:
+            st.sidebar.success("Data saved successfully!") # Feedback in Streamlit
+        return True
 
     def save_all(self):
-        # Convert objects back to dicts for saving
-        customer_dicts_to_save = {cid: c.to_dict() for cid, c in self.customers.items()}
-        job_dicts_to_save = {jid: j.to_dict() for jid, j in self.jobs.items()}
-        save_data(customer_dicts_to_save, CUSTOMER_DATA_FILE)
-        save_data(job_dicts_to_save, JOB_DATA_FILE)
+        """Folds the journal into fresh snapshots, archiving closed past-season jobs. Returns False on failure."""
+        with self.store.lock():
+            self._catch_up()
+            # Convert objects back to dicts and fold the journal into fresh snapshots. Closed jobs from past
+            # seasons go to the archive; jobs already read back from it are there unchanged.
+            current_season = str(datetime.now().year)
+            customer_dicts_to_save = {cid: c.to_dict() for cid, c in self.customers.items()}
+            job_dicts_to_save, to_archive = {}, {}
+            for jid, job in self.jobs.items():
+                if jid in self._archived_ids:
+                    continue
+                if job.status in Job.CLOSED_STATUSES and job_season(job) < current_season:
+                    to_archive.setdefault(job_season(job), {})[jid] = job.to_dict()
+                else:
+                    job_dicts_to_save[jid] = job.to_dict()
+            self.archive_manifest, saved = self.store.compact(customer_dicts_to_save, job_dicts_to_save, to_archive)
+            if not saved:
+                # Everything is still in the journal; the jobs stay live until a compaction goes through
+                st.sidebar.error("Data could not be saved to the snapshot files; changes are kept in the journal.")
+                return False
+            self._retire([jid for season_jobs in to_archive.values() for jid in season_jobs
+                          if jid not in job_dicts_to_save])
         st.sidebar.success("Data saved successfully!") # Feedback in Streamlit
+        return True
+
+    def _retire(self, job_ids):
+        # Newly archived jobs leave the live set. They stay counted in the metrics (now via the season summary),
+        # and stay in memory only if their season was already loaded. Listeners aren't told: the jobs still
+        # exist, they are just stored elsewhere.
+        with self._state_lock:
+            evicted = set()
+            for job_id in job_ids:
+                job = self.jobs[job_id]
+                if job_season(job) in self._loaded_seasons:
+                    self._archived_ids.add(job_id)
+                else:
+                    evicted.add(job_id)
+                    del self.jobs[job_id]
+                    self.job_index.remove(job_id)
+                    customer_jobs = self.jobs_by_customer.get(job.customer_id, {})
+                    customer_jobs.pop(job_id, None)
+                    if not customer_jobs:
+                        self.jobs_by_customer.pop(job.customer_id, None)
+            if evicted:
+                self.schedule = [entry for entry in self.schedule if entry[1] not in evicted]
+            if job_ids:
+                self.version += 1
+
+    # --- Archived seasons ---
+    def archived_job_count(self):
+        """Archived jobs not read into memory yet."""
+        with self._state_lock:
+            return sum(entry.get('jobs', 0) for season, entry in self.archive_manifest.items()
+                       if season not in self._loaded_seasons)
+
+    def is_archived(self, job_id):
+        return job_id in self._archived_ids
+
+    def all_customers(self):
+        with self._state_lock:
+            return list(self.customers.values())
+
+    def live_jobs(self):
+        """Jobs outside the archive: everything except history read in by load_archive()."""
+        with self._state_lock:
+            if not self._archived_ids:
+                return list(self.jobs.values())
+            return [job for jid, job in self.jobs.items() if jid not in self._archived_ids]
+
+    def load_archive(self, seasons=None):
+        """Reads archived seasons (default: all) into memory so history views and searches include them.
+        Their jobs are already in the metrics through the season summaries, so they are not counted again."""
+        with self.store.lock():
+            wanted = [s for s in (seasons if seasons is not None else self.archive_manifest)
+                      if s in self.archive_manifest and s not in self._loaded_seasons]
+            for season in sorted(wanted):
+                season_data = self.store.archive.load_season(season, self.archive_manifest)
+                with self._state_lock:
+                    entries = []
+                    for jid, data in season_data.items():
+                        if jid in self.jobs:
+                            continue # The live copy wins
+                        job = self._job_from_saved(data)
+                        self.jobs[jid] = job
+                        self._archived_ids.add(jid)
+                        self._index_job(job)
+                        self.jobs_by_customer.setdefault(job.customer_id, {})[jid] = job
+                        entries.append((job.scheduled_datetime, jid))
+                    self.schedule.extend(entries)
+                    self.schedule.sort() # Mostly-sorted runs: timsort merges them in linear time
+                    self._loaded_seasons.add(season)
+                    self.version += 1
+
+    def _archive_seasons_between(self, start, end):
+        first = _schedule_key(start)[:4] if start is not None else ''
+        last = _schedule_key(end)[:4] if end is not None else '9999'
+        return [season for season in self.archive_manifest if first <= season <= last]
 
     def get_customer_by_id(self, customer_id):
         return self.customers.get(customer_id)
@@ -120,17 +1057,562 @@ class BoatHaulingManager:
     def get_job_by_id(self, job_id):
         return self.jobs.get(job_id)
 
+    # --- Indexed job lookups (no full scan, no strptime) ---
+    # Archived jobs are left out unless include_archived is set, which reads the archive in first
+    def jobs_for_customer(self, customer_id, newest_first=True, include_archived=False):
+        if include_archived:
+            self.load_archive()
+        with self._state_lock:
+            customer_jobs = [job for jid, job in self.jobs_by_customer.get(customer_id, {}).items()
+                             if include_archived or jid not in self._archived_ids]
+        return sorted(customer_jobs, key=lambda j: j.scheduled_datetime, reverse=newest_first)
+
+    def jobs_by_schedule(self, newest_first=True, statuses=None, include_archived=False):
+        if include_archived:
+            self.load_archive()
+        with self._state_lock:
+            entries = reversed(self.schedule) if newest_first else iter(self.schedule)
+            jobs = (self.jobs[job_id] for _, job_id in entries
+                    if include_archived or job_id not in self._archived_ids)
+            return [job for job in jobs if statuses is None or job.status in statuses]
+
+    def jobs_between(self, start, end, statuses=None, include_archived=False):
+        """Jobs scheduled in [start, end), oldest first; start/end are datetimes or DATETIME_FORMAT strings,
+        or None for an open end."""
+        if include_archived:
+            self.load_archive(self._archive_seasons_between(start, end))
+        with self._state_lock:
+            lo = bisect.bisect_left(self.schedule, (_schedule_key(start),)) if start is not None else 0
+            hi = bisect.bisect_left(self.schedule, (_schedule_key(end),)) if end is not None else len(self.schedule)
+            jobs = (self.jobs[job_id] for _, job_id in self.schedule[lo:hi]
+                    if include_archived or job_id not in self._archived_ids)
+            return [job for job in jobs if statuses is None or job.status in statuses]
+
+    def next_scheduled_jobs(self, n, after=None, statuses=("Scheduled",)):
+        """The next n jobs at or after `after` (default: now) with one of `statuses`."""
+        with self._state_lock:
+            pos = bisect.bisect_left(self.schedule, (_schedule_key(after if after else datetime.now()),))
+            upcoming = []
+            for _, job_id in self.schedule[pos:]:
+                if len(upcoming) >= n:
+                    break
+                if job_id in self._archived_ids:
+                    continue
+                job = self.jobs[job_id]
+                if statuses is None or job.status in statuses:
+                    upcoming.append(job)
+            return upcoming
+
+    # --- Proximity lookups ---
+    def customers_near(self, customer_id, miles):
+        """[(customer, miles)] for other customers living within `miles` of this one, nearest first."""
+        with self._state_lock:
+            point = self.customer_locations.point(customer_id)
+            if point is None:
+                return []
+            return [(self.customers[cid], distance) for cid, distance in self.customer_locations.within(*point, miles)
+                    if cid != customer_id]
+
+    def nearest_harbor(self, customer):
+        """(harbor, miles) closest to the customer's home, or None without coordinates."""
+        if not customer.home_coordinates:
+            return None
+        return HARBOR_INDEX.nearest(*customer.home_coordinates)[0]
+
+    def tide_conflicts(self, tide_table):
+        """TideConflicts (job_id -> TideConflict) for active jobs at a known harbor that fall outside the tide
+        window for the boat's draft. One vectorized pass over all jobs, reused until the data changes."""
+        memo_version, conflicts = self._tide_conflicts
+        if memo_version == self.version:
+            return conflicts
+        harbor_codes = {} # location text -> harbor code, most jobs share a handful of ramps
+        job_ids, codes, times, drafts = [], [], [], []
+        with self._state_lock:
+            version = self.version
+            for job in self.jobs.values():
+                if job.status not in Job.ACTIVE_STATUSES:
+                    continue
+                code = -1
+                for location in (job.origin_location, job.destination_location):
+                    if location not in harbor_codes:
+                        harbor = tide_table.harbor_for_location(location)
+                        harbor_codes[location] = tide_table.harbor_code(harbor) if harbor else -1
+                    code = harbor_codes[location]
+                    if code >= 0:
+                        break
+                if code < 0:
+                    continue
+                customer = self.customers.get(job.customer_id)
+                job_ids.append(job.job_id)
+                codes.append(code)
+                times.append(job.scheduled_datetime)
+                drafts.append(customer.boat_draft if customer and customer.boat_draft is not None else np.nan)
+
+        check = check_tide_windows(tide_table, codes, datetime_strings_to_minutes(times), drafts)
+        conflicts = TideConflicts(tide_table.harbors, job_ids, codes, drafts, check)
+        self._tide_conflicts = (version, conflicts)
+        return conflicts
+
+    def search_customers(self, query, fields=None, rank=True):
+        with self._state_lock:
+            return [self.customers[cid] for cid in self.customer_index.search(query, fields, rank)]
+
+    def search_jobs(self, query, fields=None, rank=True, include_archived=False):
+        if include_archived:
+            self.load_archive()
+        with self._state_lock:
+            return [self.jobs[jid] for jid in self.job_index.search(query, fields, rank)
+                    if include_archived or jid not in self._archived_ids]
+
+# --- Route Planning ---
+def plan_routes_for_day(manager, tide_table, day):
+    """Truck routes for the active jobs scheduled on `day` (a date).
+    Returns (routes, unassigned, unlocated); unlocated jobs have neither home coordinates nor a known harbor."""
+    day_start = datetime.combine(day, datetime.min.time())
+    jobs = manager.jobs_between(day_start, day_start + timedelta(days=1), statuses=Job.ACTIVE_STATUSES)
+
+    planned, unlocated = [], []
+    for job in jobs:
+        customer = manager.get_customer_by_id(job.customer_id)
+        home = customer.home_coordinates if customer else None
+        harbor = tide_table.harbor_for_location(job.origin_location) or tide_table.harbor_for_location(job.destination_location)
+        ramp = HARBOR_COORDINATES.get(harbor)
+        if not (home or ramp):
+            unlocated.append(job)
+            continue
+        if 'haul' in job.service_type.lower():
+            start, end = ramp or home, home or ramp # Up the ramp and back to land
+            ramp_is_drop_off = False
+        else:
+            start, end = home or ramp, ramp or home
+            ramp_is_drop_off = bool(home and ramp)
+        planned.append((job, customer, harbor, start, end, ramp_is_drop_off))
+
+    # Tide windows for every ramp visit in one vectorized pass
+    check = check_tide_windows(
+        tide_table, [tide_table.harbor_code(harbor) if harbor else -1 for _, _, harbor, _, _, _ in planned],
+        datetime_strings_to_minutes([job.scheduled_datetime for job, _, _, _, _, _ in planned]),
+        [c.boat_draft if c and c.boat_draft is not None else np.nan for _, c, _, _, _, _ in planned])
+    midnight = to_epoch_minutes(day_start)
+
+    stops = []
+    for i, (job, customer, harbor, start, end, ramp_is_drop_off) in enumerate(planned):
+        service_minutes = service_minutes_for(customer.boat_type if customer else None)
+        window = None
+        if check['high_tide'][i] != NO_TIDE:
+            high_tide = int(check['high_tide'][i]) - midnight
+            window = (high_tide - int(check['window'][i]), high_tide + int(check['window'][i]))
+            if ramp_is_drop_off:
+                # Stop windows constrain the pickup; a launch has to reach the ramp inside the tide window
+                offset = drop_off_offset_minutes(start, end, service_minutes)
+                window = (window[0] - offset, window[1] - offset)
+        stops.append(Stop(job.job_id, start, end, float(customer.boat_length) if customer else 0.0, service_minutes,
+                          window))
+    routes, unassigned = plan_day(stops)
+    return routes, unassigned, unlocated
+
+def format_minutes_of_day(minutes):
+    minutes = int(round(minutes))
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+# --- Bulk Customer Import ---
+# CSV header -> Customer attribute. Covers Customers.csv.csv, customers_OLD.csv and the app's own field names.
+CSV_COLUMN_MAP = {
+    'customer name': 'name', 'name': 'name',
+    'phone': 'phone', 'phone number': 'phone',
+    'email': 'email', 'email address': 'email',
+    'address': 'address', 'home address': 'address', 'billing address': 'address',
+    'boat make': 'boat_make', 'boat model': 'boat_model', 'boat name': 'boat_name',
+    'boat type': 'boat_type', 'boat length': 'boat_length', 'boat draft': 'boat_draft',
+    'home latitude': 'home_latitude', 'home longitude': 'home_longitude',
+    'is ecm boat': 'is_ecm_boat', 'ramp': 'ramp',
+}
+TRUE_VALUES = {'true', 'yes', 'y', '1'}
+FALSE_VALUES = {'false', 'no', 'n', '0', ''}
+
+ImportReport = namedtuple('ImportReport', ['imported', 'duplicates', 'errors', 'ignored_columns'])
+
+def customer_dedupe_key(name, boat_type, boat_length):
+    # Same owner, same kind of boat, same length: treat as the same customer
+    return (name.strip().lower(), (boat_type or "").strip().lower(), round(float(boat_length), 1))
+
+def customer_from_csv_row(row):
+    """Customer from a CSV row already keyed by Customer attribute names; raises ValueError on bad data."""
+    name = (row.get('name') or "").strip()
+    if not name:
+        raise ValueError("missing Customer Name")
+    try:
+        boat_length = float(row.get('boat_length') or 0)
+    except ValueError:
+        raise ValueError(f"Boat Length '{row.get('boat_length')}' is not a number")
+    if boat_length <= 0:
+        raise ValueError("Boat Length must be greater than 0")
+
+    numbers = {}
+    for field, low, high in (('boat_draft', 0, 30), ('home_latitude', -90, 90), ('home_longitude', -180, 180)):
+        raw = (row.get(field) or "").strip()
+        if not raw:
+            numbers[field] = None
+            continue
+        try:
+            value = float(raw)
+        except ValueError:
+            raise ValueError(f"{field.replace('_', ' ').title()} '{raw}' is not a number")
+        if not low <= value <= high:
+            raise ValueError(f"{field.replace('_', ' ').title()} {value} is out of range")
+        numbers[field] = value
+    if (numbers['home_latitude'] is None) != (numbers['home_longitude'] is None):
+        raise ValueError("Home Latitude and Home Longitude must be given together")
+
+    ecm = (row.get('is_ecm_boat') or "").strip().lower()
+    if ecm not in TRUE_VALUES | FALSE_VALUES:
+        raise ValueError(f"Is ECM Boat '{row.get('is_ecm_boat')}' is not true/false")
+
+    return Customer(name, (row.get('phone') or "").strip(), (row.get('email') or "").strip(),
+                    (row.get('address') or "").strip(), (row.get('boat_make') or "").strip(),
+                    (row.get('boat_model') or "").strip(), boat_length, (row.get('boat_name') or "").strip(),
+                    boat_draft=numbers['boat_draft'], boat_type=(row.get('boat_type') or "").strip() or None,
+                    home_latitude=numbers['home_latitude'], home_longitude=numbers['home_longitude'],
+                    is_ecm_boat=ecm in TRUE_VALUES, ramp=(row.get('ramp') or "").strip())
+
+def import_customers_csv(manager, text_stream, batch_size=IMPORT_BATCH_SIZE, on_batch=None):
+    """Streams customers from an open CSV text stream into the manager, committing one journal write per
+    batch. Rows that fail validation or duplicate an existing/earlier customer are skipped and reported.
+    on_batch(rows_read, imported) is called after each commit. Returns an ImportReport; errors are
+    (line number, message) pairs."""
+    reader = csv.reader(text_stream)
+    header = next(reader, None)
+    if header is None:
+        return ImportReport(0, 0, [(1, "file is empty")], [])
+    fields = [CSV_COLUMN_MAP.get(column.strip().lower()) for column in header]
+    ignored_columns = [column for column, field in zip(header, fields) if field is None]
+    if 'name' not in fields:
+        return ImportReport(0, 0, [(1, "no 'Customer Name' column")], ignored_columns)
+
+    seen = {customer_dedupe_key(c.name, c.boat_type, c.boat_length) for c in manager.all_customers()}
+    imported, duplicates, errors, batch = 0, 0, [], []
+    rows_read = 0
+    for line_number, values in enumerate(reader, start=2):
+        if not any(value.strip() for value in values):
+            continue
+        rows_read += 1
+        try:
+            customer = customer_from_csv_row({f: v for f, v in zip(fields, values) if f})
+        except ValueError as e:
+            errors.append((line_number, str(e)))
+            continue
+        key = customer_dedupe_key(customer.name, customer.boat_type, customer.boat_length)
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        batch.append(customer)
+        if len(batch) >= batch_size:
+            if not manager.add_customers(batch):
+                errors.append((line_number, f"could not save the {len(batch)} customer(s) up to here; import stopped"))
+                batch = []
+                break
+            imported += len(batch)
+            batch = []
+            if on_batch:
+                on_batch(rows_read, imported)
+    if batch:
+        if manager.add_customers(batch):
+            imported += len(batch)
+        else:
+            errors.append((line_number, f"could not save the last {len(batch)} customer(s)"))
+    if on_batch:
+        on_batch(rows_read, imported)
+    if manager.store.needs_compaction():
+        manager.save_all()
+    return ImportReport(imported, duplicates, errors, ignored_columns)
+
+# --- Job Export ---
+# Jobs joined with their customer, one flat row each, for the bookkeeping spreadsheets
+EXPORT_COLUMNS = ('job_id', 'scheduled_datetime', 'status', 'service_type', 'origin_location', 'destination_location',
+                  'quoted_price', 'notes', 'created_at', 'updated_at', 'customer_id', 'customer_name', 'phone', 'email',
+                  'boat_make', 'boat_model', 'boat_length', 'boat_type', 'boat_draft')
+EXPORT_FLOAT_COLUMNS = ('quoted_price', 'boat_length', 'boat_draft')
+
+ExportResult = namedtuple('ExportResult', ['rows', 'csv_path', 'parquet_path', 'changed_since'])
+
+def iter_export_rows(manager, statuses=None, start=None, end=None, changed_since=None, include_archived=False):
+    """Yields a tuple in EXPORT_COLUMNS order for each job scheduled in [start, end) whose status is in
+    `statuses` and, if changed_since is given, whose updated_at is at or after it. Oldest first."""
+    # jobs_between() hands back a list, so other sessions' edits can't disturb the iteration
+    for job in manager.jobs_between(start, end, statuses, include_archived=include_archived):
+        if changed_since and job.updated_at < changed_since:
+            continue
+        customer = manager.customers.get(job.customer_id)
+        row = (job.job_id, job.scheduled_datetime, job.status, job.service_type, job.origin_location,
+               job.destination_location, job.quoted_price, job.notes, job.created_at, job.updated_at, job.customer_id)
+        if customer is None:
+            yield row + (None,) * 8
+        else:
+            yield row + (customer.name, customer.phone, customer.email, customer.boat_make, customer.boat_model,
+                         customer.boat_length, customer.boat_type, customer.boat_draft)
+
+def iter_chunks(rows, chunk_rows=EXPORT_CHUNK_ROWS):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _parquet_schema():
+    return pa.schema([(name, pa.float64() if name in EXPORT_FLOAT_COLUMNS else pa.string()) for name in EXPORT_COLUMNS])
+
+def _parquet_table(chunk, schema):
+    arrays = []
+    for name, values in zip(EXPORT_COLUMNS, zip(*chunk)):
+        if name in EXPORT_FLOAT_COLUMNS:
+            arrays.append(pa.array([_float_or_none(v) for v in values], type=pa.float64()))
+        else:
+            arrays.append(pa.array([None if v is None else str(v) for v in values], type=pa.string()))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+def _float_or_none(value):
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+def load_export_state(state_file=EXPORT_STATE_FILE):
+    try:
+        with open(state_file, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def export_state_key(csv_path, statuses=None, start=None, end=None, include_archived=False):
+    """Key of an incremental export's watermark in the state file. Each filter combination keeps its own, so
+    a filtered run never moves the mark past jobs it left out; an unfiltered export is keyed by its path."""
+    if statuses is not None and set(statuses) >= set(Job.VALID_STATUSES):
+        statuses = None
+    if statuses is None and start is None and end is None and not include_archived:
+        return csv_path
+    return json.dumps([csv_path, sorted(statuses) if statuses is not None else None,
+                       _schedule_key(start) if start is not None else None,
+                       _schedule_key(end) if end is not None else None, include_archived])
+
+def export_jobs(manager, csv_path=JOB_CSV_FILE, statuses=None, start=None, end=None, incremental=False,
+                parquet=True, chunk_rows=EXPORT_CHUNK_ROWS, state_file=EXPORT_STATE_FILE, include_archived=False):
+    """Streams the matching jobs to csv_path (and a .parquet beside it when pyarrow is installed and parquet is
+    True), EXPORT_CHUNK_ROWS at a time; files are replaced atomically. With incremental=True only jobs updated
+    since the last incremental export of csv_path with the same filters are written; include_archived reads in
+    the archived seasons the date range covers. Returns an ExportResult, or None on I/O error."""
+    state_key = export_state_key(csv_path, statuses, start, end, include_archived)
+    state = load_export_state(state_file) if incremental else {}
+    changed_since = state.get(state_key) if incremental else None
+    # updated_at has minute resolution, so the next run repeats this minute rather than risk missing it
+    export_started = datetime.now().strftime(DATETIME_FORMAT)
+    parquet_path = os.path.splitext(csv_path)[0] + '.parquet' if parquet and pq is not None else None
+
+    rows = 0
+    csv_tmp, parquet_tmp = f"{csv_path}.tmp", f"{parquet_path}.tmp" if parquet_path else None
+    parquet_writer = None
+    try:
+        with open(csv_tmp, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_COLUMNS)
+            if parquet_path:
+                parquet_writer = pq.ParquetWriter(parquet_tmp, _parquet_schema())
+            export_rows = iter_export_rows(manager, statuses, start, end, changed_since, include_archived)
+            for chunk in iter_chunks(export_rows, chunk_rows):
+                writer.writerows(chunk)
+                if parquet_writer is not None:
+                    parquet_writer.write_table(_parquet_table(chunk, parquet_writer.schema))
+                rows += len(chunk)
+        if parquet_writer is not None:
+            parquet_writer.close()
+            parquet_writer = None
+            os.replace(parquet_tmp, parquet_path)
+        os.replace(csv_tmp, csv_path)
+    except (IOError, OSError):
+        if parquet_writer is not None:
+            parquet_writer.close()
+        st.error(f"Error: Could not write the job export to {csv_path}")
+        return None
+
+    if incremental:
+        state[state_key] = export_started
+        save_data(state, state_file)
+    return ExportResult(rows, csv_path, parquet_path, changed_since)
+
+# --- List Paging Helpers ---
+# The filtered/sorted result is kept in the session and only the current page is rendered, so a rerun
+# costs O(page size) rather than a rescan plus one expander per record.
+def cached_query(key, params, version, compute):
+    """Returns compute(), reusing this session's last result while the query `params` and the data `version`
+    (manager.version) match. A new query goes back to the first page; new data alone keeps the page."""
+    cached = st.session_state.get(f"{key}_result")
+    if cached is not None and cached[0] == params and cached[1] == version:
+        return cached[2]
+    if cached is not None and cached[0] != params:
+        st.session_state[f"{key}_page"] = 1
+    result = compute()
+    st.session_state[f"{key}_result"] = (params, version, result)
+    return result
+
+def paginate(items, key):
+    """Renders page-size and page controls and returns the current page of `items`."""
+    col_size, col_page, col_info = st.columns([1, 1, 2])
+    page_size = col_size.selectbox("Per page", PAGE_SIZES, key=f"{key}_page_size")
+    page_count = max(1, -(-len(items) // page_size))
+    if st.session_state.get(f"{key}_page", 1) > page_count:
+        st.session_state[f"{key}_page"] = page_count
+    page = col_page.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, step=1, key=f"{key}_page")
+    start = (page - 1) * page_size
+    col_info.caption(f"Showing {start + 1}-{min(start + page_size, len(items))} of {len(items)}")
+    return items[start:start + page_size]
+
+def customer_table(customers):
+    # Column lists for st.dataframe; one page's worth at a time
+    return {
+        "Name": [c.name for c in customers],
+        "Phone": [c.phone for c in customers],
+        "Email": [c.email for c in customers],
+        "Boat": [f"{c.boat_length}ft {c.boat_make} {c.boat_model}".strip() for c in customers],
+        "Type": [c.boat_type or "" for c in customers],
+        "Draft (ft)": [c.boat_draft for c in customers],
+        "Customer ID": [c.customer_id for c in customers],
+    }
+
+def job_table(manager, jobs, tide_conflicts):
+    customers = [manager.get_customer_by_id(job.customer_id) for job in jobs]
+    return {
+        "Scheduled": [job.scheduled_datetime for job in jobs],
+        "Service": [job.service_type for job in jobs],
+        "Customer": [c.name if c else "N/A" for c in customers],
+        "Status": [job.status for job in jobs],
+        "Origin": [job.origin_location for job in jobs],
+        "Destination": [job.destination_location for job in jobs],
+        "Price": [job.quoted_price for job in jobs],
+        "Tide Conflict": [job.job_id in tide_conflicts for job in jobs],
+        "Job ID": [job.job_id for job in jobs],
+    }
+
+# Loaded once per process and reused by every browser session
+@st.cache_resource
+def get_shared_manager():
+    return BoatHaulingManager()
+
+@st.cache_resource
+def get_tide_table():
+    return TideTable.load()
+
+# --- Google Sheets Mirror ---
+SHEET_TABLES = {'customer': ('Customers', Customer.__slots__), 'job': ('Jobs', Job.__slots__)}
+
+def attach_sheet_sync(manager, backend, **kwargs):
+    """SheetSync fed by the manager's change notifications. Call start() to run it in the background."""
+    # Archiving only moves jobs out of jobs.json; bookkeeping still reads them from the sheet, so job rows
+    # the live set no longer lists are kept there
+    sync = SheetSync(backend, SHEET_TABLES, lambda: {'customer': manager.all_customers(), 'job': manager.live_jobs()},
+                     keep_unlisted=('job',), refresh=manager.refresh, **kwargs)
+    manager.change_listeners.append(sync.notify)
+    return sync
+
+@st.cache_resource
+def get_sheet_sync():
+    """One background sync per process, or None when no sheet is configured. The sheet is opened by the sync
+    thread, so a slow sign-in never holds up a page; missing gspread, bad credentials or no access show up
+    as a retrying sync in the sidebar while the app carries on without the mirror. With several app processes
+    only the one holding SHEETS_SYNC_LOCK_FILE writes the sheet; it picks up the others' changes from the journal."""
+    if not SHEETS_SPREADSHEET_KEY:
+        return None
+    sync = attach_sheet_sync(get_shared_manager(), None, lock_file=SHEETS_SYNC_LOCK_FILE,
+                             open_backend=lambda: GspreadBackend.open(SHEETS_SPREADSHEET_KEY, SHEETS_CREDENTIALS_FILE))
+    sync.start()
+    return sync
+
+# --- Performance Panel ---
+PERF_HISTORY_RERUNS = 30 # Reruns kept for the render-time trend
+
+class RenderTimer:
+    """Times one rerun section by section: mark(name) closes the section that ran since the previous mark."""
+    def __init__(self):
+        self.started = self._last = time.perf_counter()
+        self.sections = []
+        self.page = None
+        self.store = None
+        self.io_start = (0, 0)
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.sections.append((name, now - self._last))
+        self._last = now
+
+    def watch_io(self, store):
+        self.store = store
+        self.io_start = store.io_bytes()
+
+    def total(self):
+        return self._last - self.started
+
+def show_perf_panel(timer, manager):
+    history = st.session_state.setdefault("perf_history", [])
+    history.append(round(timer.total() * 1000, 1))
+    del history[:-PERF_HISTORY_RERUNS]
+
+    with st.expander(f"⏱ Performance: this rerun took {timer.total() * 1000:.0f} ms", expanded=True):
+        col_time, col_counts, col_io = st.columns(3)
+        col_time.markdown("**Render time by section**")
+        col_time.dataframe({"Section": [name for name, _ in timer.sections],
+                            "ms": [round(seconds * 1000, 1) for _, seconds in timer.sections]},
+                           hide_index=True, use_container_width=True)
+
+        live_jobs = len(manager.live_jobs())
+        col_counts.markdown("**Objects in memory**")
+        col_counts.dataframe({"Object": ["Customers", "Live jobs", "Archived jobs loaded", "Archived jobs on disk only",
+                                         "Schedule entries", "Customer search entries", "Job search entries",
+                                         "Journal records since snapshot", "Session state keys"],
+                              "Count": [len(manager.customers), live_jobs, len(manager.jobs) - live_jobs,
+                                        manager.archived_job_count(), len(manager.schedule), len(manager.customer_index),
+                                        len(manager.job_index), manager.store.journal_records, len(st.session_state)]},
+                             hide_index=True, use_container_width=True)
+
+        read, written = manager.store.io_bytes()
+        if timer.store is manager.store:
+            rerun_read, rerun_written = read - timer.io_start[0], written - timer.io_start[1]
+        else:
+            rerun_read = rerun_written = None
+        col_io.markdown("**Persistence I/O**")
+        col_io.dataframe({"": ["This rerun", "Since startup"],
+                          "Read (KB)": [None if rerun_read is None else round(rerun_read / 1024, 1), round(read / 1024, 1)],
+                          "Written (KB)": [None if rerun_written is None else round(rerun_written / 1024, 1),
+                                           round(written / 1024, 1)]},
+                         hide_index=True, use_container_width=True)
+        col_io.caption("The manager is shared, so another session's writes during this rerun count here too.")
+
+        st.caption(f"Total render time, last {len(history)} rerun(s) of this session (ms)")
+        st.line_chart(history, height=150)
+
 # --- Streamlit UI Application ---
 def streamlit_main():
+    timer = RenderTimer()
+    try:
+        render_app(timer)
+    finally:
+        timer.mark(f"Page: {timer.page}" if timer.page else "Page")
+        # Opt-in: the panel itself isn't timed
+        if st.sidebar.checkbox("Show performance panel", key="perf_panel"):
+            show_perf_panel(timer, get_shared_manager())
+
+def render_app(timer):
     st.set_page_config(layout="wide", page_title="Boat Hauling Automator")
     st.title("🚤 Boat Hauling Business Automator")
     st.write("Current Time:", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
 
-    # Initialize manager - this will load data from files
-    # To persist manager across reruns more efficiently, use st.session_state
-    if 'manager' not in st.session_state:
-        st.session_state.manager = BoatHaulingManager()
-    manager = st.session_state.manager
+    # One manager per server process, shared by every session (see BoatHaulingManager for the locking);
+    # refresh() picks up other processes' writes
+    manager = get_shared_manager()
+    timer.watch_io(manager.store)
+    manager.refresh()
+    timer.mark("Data refresh")
 
 
     menu_options = [
@@ -141,20 +1623,49 @@ def streamlit_main():
         "Add New Job",
         "List/View Jobs",
         "Update Job Status",
+        "Day Planner",
+        "Job Clusters",
+        "Bulk Import Customers",
+        "Export Jobs",
     ]
     menu_choice = st.sidebar.selectbox("Navigation", menu_options)
+    timer.page = menu_choice
 
     # --- Home Page ---
     if menu_choice == "Home":
         st.header("Welcome!")
         st.write("Select an option from the sidebar to manage your boat hauling business.")
         # Display some quick stats
+        # Every figure below comes from manager.metrics, kept current as jobs change
+        metrics = manager.metrics
         st.subheader("Quick Stats")
         col1, col2, col3 = st.columns(3)
         col1.metric("Total Customers", len(manager.customers))
-        col2.metric("Total Jobs", len(manager.jobs))
-        scheduled_jobs = sum(1 for job in manager.jobs.values() if job.status == "Scheduled")
-        col3.metric("Scheduled Jobs", scheduled_jobs)
+        col2.metric("Total Jobs", metrics.total_jobs())
+        col3.metric("Scheduled Jobs", metrics.status_counts["Scheduled"])
+        if manager.archive_manifest:
+            st.caption(f"Includes {sum(e.get('jobs', 0) for e in manager.archive_manifest.values())} archived job(s) from "
+                       f"{len(manager.archive_manifest)} past season(s), counted from the archive summaries.")
+
+        st.subheader("Jobs by Status")
+        for col, status in zip(st.columns(len(Job.VALID_STATUSES)), Job.VALID_STATUSES):
+            col.metric(status, metrics.status_counts[status])
+
+        st.subheader("Revenue (quoted)")
+        col1, col2 = st.columns(2)
+        col1.metric("Invoiced (outstanding)", f"${metrics.revenue('Invoiced'):,.2f}")
+        col2.metric("Paid", f"${metrics.revenue('Paid'):,.2f}")
+
+        st.subheader("Workload")
+        today = datetime.now().date()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Jobs Today", metrics.jobs_per_day.get(today.strftime("%Y-%m-%d"), 0))
+        col2.metric("Jobs This Week", metrics.jobs_per_week.get(metrics.week_of(today), 0))
+        col3.metric("Jobs Next Week", metrics.jobs_per_week.get(metrics.week_of(today + timedelta(days=7)), 0))
+        upcoming_days = [today + timedelta(days=i) for i in range(14)]
+        st.caption("Jobs per day, next two weeks (cancelled jobs excluded)")
+        st.bar_chart({"Jobs": {day.strftime("%a %m-%d"): metrics.jobs_per_day.get(day.strftime("%Y-%m-%d"), 0)
+                               for day in upcoming_days}})
 
     # --- Add New Customer ---
     elif menu_choice == "Add New Customer":
@@ -171,6 +1682,12 @@ def streamlit_main():
             boat_model = st.text_input("Boat Model*", help="Required")
             boat_length = st.number_input("Boat Length (ft)*", min_value=1.0, value=20.0, format="%.1f", help="Required")
             boat_name = st.text_input("Boat Name (optional)")
+            boat_draft = st.number_input("Boat Draft (ft, optional)", min_value=0.0, value=None, format="%.1f",
+                                         help="Deeper boats only clear the ramp close to high tide")
+            boat_type = st.selectbox("Boat Type", BOAT_TYPES, help="MD = mast on deck, MT = mast transport")
+            col_lat, col_lon = st.columns(2)
+            home_latitude = col_lat.number_input("Home Latitude (optional)", value=None, format="%.6f")
+            home_longitude = col_lon.number_input("Home Longitude (optional)", value=None, format="%.6f")
 
             submitted = st.form_submit_button("Add Customer")
 
@@ -178,10 +1695,10 @@ def streamlit_main():
                 if not all([name, phone, email, boat_make, boat_model, boat_length > 0]):
                     st.error("Please fill in all required fields marked with *.")
                 else:
-                    customer = Customer(name, phone, email, address, boat_make, boat_model, boat_length, boat_name)
-                    manager.customers[customer.customer_id] = customer
-                    manager.save_all() # Save after adding
-                    st.success(f"Customer '{name}' added successfully! ID: {customer.customer_id}")
+                    customer = Customer(name, phone, email, address, boat_make, boat_model, boat_length, boat_name, boat_draft=boat_draft,
+                                        boat_type=boat_type, home_latitude=home_latitude, home_longitude=home_longitude)
+                    if manager.add_customer(customer): # Journaled on add
+                        st.success(f"Customer '{name}' added successfully! ID: {customer.customer_id}")
 
     # --- List/View All Customers ---
     elif menu_choice == "List/View All Customers":
@@ -190,40 +1707,51 @@ def streamlit_main():
             st.info("No customers found.")
         else:
             search_query = st.text_input("Search customers by name, email, or boat...", key="customer_search_list")
-            
-            filtered_customers = []
-            if search_query:
-                search_query = search_query.lower()
-                for cust_id, customer in manager.customers.items():
-                    if (search_query in customer.name.lower() or
-                        search_query in customer.email.lower() or
-                        search_query in customer.boat_make.lower() or
-                        search_query in customer.boat_model.lower() or
-                        search_query in customer.boat_name.lower()):
-                        filtered_customers.append(customer)
-            else:
-                filtered_customers = list(manager.customers.values())
+            table_mode = st.toggle("Compact table", key="customer_list_table")
+            customer_history = bool(manager.archive_manifest) and st.checkbox(
+                "Include archived seasons in job history", key="customer_list_archived",
+                help="Reads past seasons' closed jobs from the archive the first time")
+
+            def find_customers():
+                if search_query:
+                    # Best matches first
+                    return manager.search_customers(
+                        search_query, fields=('name', 'email', 'boat_make', 'boat_model', 'boat_name'))
+                return sorted(manager.all_customers(), key=lambda c: c.name)
+            filtered_customers = cached_query("customer_list", search_query, manager.version, find_customers)
+            timer.mark("Customer query")
 
 
             if not filtered_customers:
                 st.info(f"No customers found matching '{search_query}'.")
             else:
-                st.write(f"Showing {len(filtered_customers)} customer(s).")
-                for customer in sorted(filtered_customers, key=lambda c: c.name):
-                    with st.expander(f"{customer.name} (Boat: {customer.boat_length}ft {customer.boat_make} {customer.boat_model}) - ID: ...{customer.customer_id[-6:]}"):
-                        st.markdown(f"**Phone:** {customer.phone}")
-                        st.markdown(f"**Email:** {customer.email}")
-                        st.markdown(f"**Address:** {customer.address if customer.address else 'N/A'}")
-                        st.markdown(f"**Boat Name:** {customer.boat_name if customer.boat_name else 'N/A'}")
-                        st.markdown(f"**Customer ID:** `{customer.customer_id}`")
-
-                        customer_jobs = [job for job in manager.jobs.values() if job.customer_id == customer.customer_id]
-                        if customer_jobs:
-                            st.write("**Associated Jobs:**")
-                            for job in sorted(customer_jobs, key=lambda j: datetime.strptime(j.scheduled_datetime, DATETIME_FORMAT), reverse=True):
-                                st.info(f"- {job.scheduled_datetime}: {job.service_type} ({job.status}) - Job ID: ...{job.job_id[-6:]}")
-                        else:
-                            st.write("No associated jobs.")
+                st.write(f"Found {len(filtered_customers)} customer(s).")
+                page = paginate(filtered_customers, "customer_list")
+                if table_mode:
+                    st.dataframe(customer_table(page), hide_index=True, use_container_width=True)
+                else:
+                    for customer in page:
+                        with st.expander(f"{customer.name} (Boat: {customer.boat_length}ft {customer.boat_make} {customer.boat_model}) - ID: ...{customer.customer_id[-6:]}"):
+                            st.markdown(f"**Phone:** {customer.phone}")
+                            st.markdown(f"**Email:** {customer.email}")
+                            st.markdown(f"**Address:** {customer.address if customer.address else 'N/A'}")
+                            st.markdown(f"**Boat Name:** {customer.boat_name if customer.boat_name else 'N/A'}")
+                            st.markdown(f"**Boat Type:** {customer.boat_type if customer.boat_type else 'N/A'}")
+                            st.markdown(f"**Boat Draft:** {f'{customer.boat_draft}ft' if customer.boat_draft is not None else 'N/A'}")
+                            st.markdown(f"**Customer ID:** `{customer.customer_id}`")
+                            nearest_harbor = manager.nearest_harbor(customer)
+                            if nearest_harbor:
+                                nearby = manager.customers_near(customer.customer_id, NEARBY_CUSTOMER_MILES)
+                                st.markdown(f"**Nearest Harbor:** {nearest_harbor[0]} ({nearest_harbor[1]:.1f} mi) | "
+                                            f"**Customers within {NEARBY_CUSTOMER_MILES:g} mi:** {len(nearby)}")
+
+                            customer_jobs = manager.jobs_for_customer(customer.customer_id, include_archived=customer_history)
+                            if customer_jobs:
+                                st.write("**Associated Jobs:**")
+                                for job in customer_jobs:
+                                    st.info(f"- {job.scheduled_datetime}: {job.service_type} ({job.status}) - Job ID: ...{job.job_id[-6:]}")
+                            else:
+                                st.write("No associated jobs.")
 
     # --- Find Customer (Simplified for Streamlit context) ---
     elif menu_choice == "Find Customer":
@@ -231,11 +1759,7 @@ def streamlit_main():
         search_term = st.text_input("Enter Customer Name, Phone, or Email to search:").lower()
         results = []
         if search_term: # Only search if there's a term
-            for cust_id, customer in manager.customers.items():
-                if (search_term in customer.name.lower() or
-                    (customer.phone and search_term in customer.phone.lower()) or
-                    (customer.email and search_term in customer.email.lower())):
-                    results.append(customer)
+            results = manager.search_customers(search_term, fields=('name', 'phone', 'email'))
 
         if search_term and not results:
             st.info("No customers found matching your search.")
@@ -262,7 +1786,7 @@ def streamlit_main():
             return
 
         with st.form("add_job_form", clear_on_submit=True):
-            customer_list = list(manager.customers.values())
+            customer_list = manager.all_customers()
             customer_options = {f"{c.name} ({c.boat_make} {c.boat_model}, ID: ...{c.customer_id[-6:]})": c.customer_id for c in sorted(customer_list, key=lambda c: c.name)}
 
             if not customer_options: # Should be caught by manager.customers check
@@ -297,10 +1821,9 @@ def streamlit_main():
                     scheduled_datetime_str = f"{scheduled_date.strftime('%Y-%m-%d')} {scheduled_time.strftime('%H:%M')}"
                     try:
                         job = Job(customer_id, service_type, scheduled_datetime_str, origin_location, destination_location, quoted_price, notes)
-                        manager.jobs[job.job_id] = job
-                        manager.save_all()
-                        customer_name = manager.get_customer_by_id(customer_id).name if manager.get_customer_by_id(customer_id) else "Unknown"
-                        st.success(f"Job for '{customer_name}' added successfully! Job ID: {job.job_id}")
+                        if manager.add_job(job):
+                            customer_name = manager.get_customer_by_id(customer_id).name if manager.get_customer_by_id(customer_id) else "Unknown"
+                            st.success(f"Job for '{customer_name}' added successfully! Job ID: {job.job_id}")
                     except ValueError as e: # Catch invalid date format from Job class
                         st.error(f"Error creating job: {e}")
                     except KeyError: # Should not happen if customer_id is from selectbox
@@ -310,7 +1833,7 @@ def streamlit_main():
     # --- List/View Jobs ---
     elif menu_choice == "List/View Jobs":
         st.header("📋 List of Jobs")
-        if not manager.jobs:
+        if not manager.jobs and not manager.archive_manifest:
             st.info("No jobs found.")
         else:
             status_options = ["All"] + Job.VALID_STATUSES
@@ -318,59 +1841,79 @@ def streamlit_main():
 
             search_job_query = st.text_input("Search jobs (customer name, service, notes)...", key="job_search_list")
 
-            jobs_to_display = []
-            for job_id, job in manager.jobs.items():
-                if filter_status != "All" and job.status != filter_status:
-                    continue
-                
-                customer = manager.get_customer_by_id(job.customer_id)
-                customer_name = customer.name if customer else "N/A (Customer not found)"
+            tide_conflicts = manager.tide_conflicts(get_tide_table())
+            timer.mark("Tide conflicts")
+            if tide_conflicts:
+                st.warning(f"⚠️ {len(tide_conflicts)} active job(s) are booked outside the tide window for the boat's draft.")
+            only_tide_conflicts = st.checkbox("Only show tide conflicts", key="job_tide_conflicts_only")
 
-                display_job = True
+            sort_by_match = False
+            if search_job_query:
+                sort_by_match = st.radio("Sort by", ["Scheduled Date", "Best Match"], horizontal=True,
+                                         key="job_search_sort") == "Best Match"
+            table_mode = st.toggle("Compact table", key="job_list_table")
+            include_archived = bool(manager.archive_manifest) and st.checkbox(
+                "Include archived seasons", key="job_list_archived",
+                help=f"{manager.archived_job_count()} closed job(s) from past seasons are not loaded yet"
+                     if manager.archived_job_count() else "Past seasons are loaded")
+
+            def find_jobs():
                 if search_job_query:
-                    sq = search_job_query.lower()
-                    if not (sq in customer_name.lower() or
-                            sq in job.service_type.lower() or
-                            sq in job.origin_location.lower() or
-                            (job.destination_location and sq in job.destination_location.lower()) or
-                            sq in job.notes.lower()):
-                        display_job = False
-                
-                if display_job:
-                    jobs_to_display.append((job, customer_name))
+                    matching_jobs = manager.search_jobs(search_job_query, rank=sort_by_match, include_archived=include_archived)
+                    if not sort_by_match:
+                        matching_jobs.sort(key=lambda j: j.scheduled_datetime, reverse=True)
+                else:
+                    # Already in date order
+                    matching_jobs = manager.jobs_by_schedule(newest_first=True, include_archived=include_archived)
+                return [job for job in matching_jobs
+                        if (filter_status == "All" or job.status == filter_status)
+                        and (not only_tide_conflicts or job.job_id in tide_conflicts)]
+            jobs_to_display = cached_query(
+                "job_list", (filter_status, search_job_query, sort_by_match, only_tide_conflicts, include_archived),
+                manager.version, find_jobs)
+            timer.mark("Job query")
 
 
             if not jobs_to_display:
                 st.info(f"No jobs found matching your criteria.")
             else:
-                st.write(f"Showing {len(jobs_to_display)} job(s).")
-                # Sort jobs by scheduled date
-                jobs_to_display.sort(key=lambda item: datetime.strptime(item[0].scheduled_datetime, DATETIME_FORMAT), reverse=True)
-
-                for job, customer_name_for_job in jobs_to_display:
-                    expander_title = f"{job.scheduled_datetime} - {job.service_type} for {customer_name_for_job} - Status: {job.status} (ID: ...{job.job_id[-6:]})"
-                    with st.expander(expander_title):
-                        st.markdown(f"**Job ID:** `{job.job_id}`")
-                        st.markdown(f"**Customer:** {customer_name_for_job} (ID: `{job.customer_id}`)")
-                        st.markdown(f"**Service:** {job.service_type}")
-                        st.markdown(f"**Origin:** {job.origin_location}")
-                        st.markdown(f"**Destination:** {job.destination_location if job.destination_location else 'Same as Origin'}")
-                        st.markdown(f"**Price:** ${job.quoted_price:.2f}")
-                        st.markdown(f"**Status:** `{job.status}`")
-                        st.markdown(f"**Notes:** {job.notes if job.notes else 'N/A'}")
-                        st.caption(f"Created: {job.created_at} | Last Updated: {job.updated_at}")
+                st.write(f"Found {len(jobs_to_display)} job(s).")
+                page = paginate(jobs_to_display, "job_list")
+                if table_mode:
+                    st.dataframe(job_table(manager, page, tide_conflicts), hide_index=True, use_container_width=True)
+                else:
+                    for job in page:
+                        customer = manager.get_customer_by_id(job.customer_id)
+                        customer_name_for_job = customer.name if customer else "N/A (Customer not found)"
+                        expander_title = f"{job.scheduled_datetime} - {job.service_type} for {customer_name_for_job} - Status: {job.status} (ID: ...{job.job_id[-6:]})"
+                        with st.expander(expander_title):
+                            st.markdown(f"**Job ID:** `{job.job_id}`")
+                            st.markdown(f"**Customer:** {customer_name_for_job} (ID: `{job.customer_id}`)")
+                            st.markdown(f"**Service:** {job.service_type}")
+                            st.markdown(f"**Origin:** {job.origin_location}")
+                            st.markdown(f"**Destination:** {job.destination_location if job.destination_location else 'Same as Origin'}")
+                            st.markdown(f"**Price:** ${job.quoted_price:.2f}")
+                            st.markdown(f"**Status:** `{job.status}`")
+                            st.markdown(f"**Notes:** {job.notes if job.notes else 'N/A'}")
+                            conflict = tide_conflicts.get(job.job_id)
+                            if conflict:
+                                draft_text = f"{conflict.draft}ft draft" if conflict.draft is not None else "unknown draft"
+                                st.warning(f"**Tide:** high tide at {conflict.harbor} is {conflict.high_tide.strftime(DATETIME_FORMAT)}; "
+                                           f"a boat with {draft_text} needs to be within {conflict.window_minutes} min of it. "
+                                           f"Nearest feasible slot: **{conflict.suggested.strftime(DATETIME_FORMAT)}**")
+                            st.caption(f"Created: {job.created_at} | Last Updated: {job.updated_at}")
 
 
     # --- Update Job Status ---
     elif menu_choice == "Update Job Status":
         st.header("🔄 Update Job Status")
-        if not manager.jobs:
+        if not manager.jobs and not manager.archive_manifest:
             st.info("No jobs to update.")
             return
+        include_archived = bool(manager.archive_manifest) and st.checkbox("Include archived seasons", key="status_update_archived")
 
-        job_list = list(manager.jobs.values())
         job_options = {}
-        for j in sorted(job_list, key=lambda job: datetime.strptime(job.scheduled_datetime, DATETIME_FORMAT), reverse=True):
+        for j in manager.jobs_by_schedule(newest_first=True, include_archived=include_archived):
             customer = manager.get_customer_by_id(j.customer_id)
             customer_name = customer.name if customer else "Unknown Cust."
             job_options[f"{j.scheduled_datetime} - {j.service_type} for {customer_name} (ID: ...{j.job_id[-6:]}) - Current: {j.status}"] = j.job_id
@@ -390,23 +1933,191 @@ def streamlit_main():
                 new_status = st.selectbox("Select New Status", Job.VALID_STATUSES, index=current_status_index, key=f"status_update_{job_id_to_update}")
 
                 if st.button("Confirm Status Update", key=f"btn_update_{job_id_to_update}"):
-                    if job_to_update.update_status(new_status):
-                        manager.save_all()
+                    if manager.update_job_status(job_to_update, new_status):
                         st.success(f"Job {job_to_update.job_id} status updated to '{new_status}'.")
                         st.experimental_rerun() # Rerun to refresh display/selectbox options
                     else:
-                        # This path should ideally not be reached if VALID_STATUSES is used for selectbox
-                        st.error(f"Invalid status '{new_status}'. Status not updated.")
+                        # A status outside VALID_STATUSES (not offered by the selectbox) or a failed journal write,
+                        # which the store has already reported
+                        st.error(f"Status not updated to '{new_status}'.")
             else:
                 st.error("Selected job not found. This shouldn't happen.")
         else:
             st.info("Please select a job to update.")
 
+    # --- Day Planner ---
+    elif menu_choice == "Day Planner":
+        st.header("🚚 Day Planner")
+        plan_date = st.date_input("Plan routes for", datetime.now().date(), key="day_planner_date")
+        routes, unassigned, unlocated = plan_routes_for_day(manager, get_tide_table(), plan_date)
+        timer.mark("Route planning")
+
+        if not routes and not unassigned and not unlocated:
+            st.info("No active jobs scheduled for this day.")
+        else:
+            total_miles = sum(route.miles for route in routes)
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Total Miles", f"{total_miles:.1f}")
+            col2.metric("Trucks Out", len(routes))
+            col3.metric("Stops", sum(len(route.stops) for route in routes))
+
+            map_points = []
+            for route in routes:
+                st.subheader(f"Truck {route.truck} - {len(route.stops)} stop(s), {route.miles:.1f} miles")
+                if route.late_minutes > 0:
+                    st.warning(f"This run misses a tide or business-hours window by {route.late_minutes:.0f} minute(s) in total.")
+                rows = []
+                for stop_number, (stop, start) in enumerate(zip(route.stops, route.start_minutes), start=1):
+                    job = manager.get_job_by_id(stop.key)
+                    customer = manager.get_customer_by_id(job.customer_id)
+                    rows.append({
+                        "#": stop_number,
+                        "Start": format_minutes_of_day(start),
+                        "Window": f"{format_minutes_of_day(stop.window[0])}-{format_minutes_of_day(stop.window[1])}" if stop.window else "",
+                        "Customer": customer.name if customer else "N/A",
+                        "Service": job.service_type,
+                        "From": job.origin_location,
+                        "To": job.destination_location if job.destination_location else "Same as Origin",
+                        "Booked": job.scheduled_datetime[-5:],
+                    })
+                    map_points.append({"lat": stop.start[0], "lon": stop.start[1]})
+                st.dataframe(rows, hide_index=True, use_container_width=True)
+            if map_points:
+                st.map(map_points)
+
+            for stop in unassigned:
+                st.error(f"Job ...{stop.key[-6:]}: a {stop.boat_length:.0f}ft boat is too long for every truck.")
+            for job in unlocated:
+                st.warning(f"Job ...{job.job_id[-6:]} ({job.service_type}) has no customer coordinates or known harbor and was left out.")
+
+    # --- Job Clusters ---
+    elif menu_choice == "Job Clusters":
+        st.header("🗺️ Job Clusters")
+        st.write("Groups a week's scheduled jobs by where the boats live, so one trip can cover neighboring boats.")
+        today = datetime.now().date()
+        col_week, col_service = st.columns(2)
+        week_of = col_week.date_input("Week of", today - timedelta(days=today.weekday()), key="cluster_week")
+        service_filter = col_service.text_input("Service type contains", "Haul", key="cluster_service")
+        col_radius, col_size = st.columns(2)
+        radius_miles = col_radius.slider("Max hop between neighbors (mi)", 0.5, 10.0, 3.0, 0.5, key="cluster_radius")
+        max_batch = col_size.slider("Max boats per batch", 1, 12, 4, key="cluster_size")
+
+        week_start = datetime.combine(week_of - timedelta(days=week_of.weekday()), datetime.min.time())
+        pending = [job for job in manager.jobs_between(week_start, week_start + timedelta(days=7), statuses=["Scheduled"])
+                   if service_filter.lower() in job.service_type.lower()]
+        points, unlocated = {}, []
+        pending_by_id = {job.job_id: job for job in pending}
+        for job in pending:
+            customer = manager.get_customer_by_id(job.customer_id)
+            if customer and customer.home_coordinates:
+                points[job.job_id] = customer.home_coordinates
+            else:
+                unlocated.append(job)
+
+        if not pending:
+            st.info(f"No scheduled jobs for the week of {week_start.strftime('%Y-%m-%d')}.")
+        else:
+            clusters = cluster_points(points, radius_miles, max_batch)
+            st.write(f"{len(points)} job(s) in {len(clusters)} batch(es).")
+            for batch_number, job_ids in enumerate(clusters, start=1):
+                coords = np.array([points[job_id] for job_id in job_ids])
+                centroid = coords.mean(axis=0)
+                spread = haversine_matrix([centroid[0]], [centroid[1]], coords[:, 0], coords[:, 1]).max()
+                harbor, harbor_miles = HARBOR_INDEX.nearest(*centroid)[0]
+                with st.expander(f"Batch {batch_number}: {len(job_ids)} boat(s) near {harbor} ({harbor_miles:.1f} mi) - within {spread:.1f} mi of center"):
+                    for job in sorted((pending_by_id[jid] for jid in job_ids), key=lambda j: j.scheduled_datetime):
+                        customer = manager.get_customer_by_id(job.customer_id)
+                        st.markdown(f"- {job.scheduled_datetime}: {job.service_type} for {customer.name} "
+                                    f"({customer.boat_length}ft) - Job ID: ...{job.job_id[-6:]}")
+            if unlocated:
+                st.warning(f"{len(unlocated)} job(s) have no customer coordinates and could not be clustered.")
+
+    # --- Bulk Import Customers ---
+    elif menu_choice == "Bulk Import Customers":
+        st.header("📥 Bulk Import Customers")
+        st.write("Upload a CSV with a `Customer Name` column and any of: `Boat Type`, `Boat Length`, `Boat Draft`, "
+                 "`Home Latitude`, `Home Longitude`, `Is ECM Boat`, `Home Address`, `Ramp`, `Phone`, `Email`. "
+                 "Rows matching an existing customer (name, boat type and length) are skipped.")
+        uploaded = st.file_uploader("Customer CSV", type=["csv", "old"], key="bulk_import_file")
+        if uploaded is not None and st.button("Import Customers"):
+            progress = st.progress(0.0, text="Importing...")
+            total_bytes = max(uploaded.size, 1)
+            text_stream = io.TextIOWrapper(uploaded, encoding="utf-8-sig", newline="")
+            report = import_customers_csv(
+                manager, text_stream,
+                on_batch=lambda rows, done: progress.progress(min(uploaded.tell() / total_bytes, 1.0),
+                                                              text=f"{done} imported from {rows} row(s)"))
+            progress.progress(1.0, text="Done")
+            st.success(f"Imported {report.imported} customer(s); skipped {report.duplicates} duplicate(s).")
+            if report.ignored_columns:
+                st.info(f"Ignored column(s): {', '.join(report.ignored_columns)}")
+            if report.errors:
+                st.error(f"{len(report.errors)} row(s) could not be imported.")
+                st.dataframe({"Line": [line for line, _ in report.errors], "Problem": [msg for _, msg in report.errors]},
+                             hide_index=True, use_container_width=True)
+
+    # --- Export Jobs ---
+    elif menu_choice == "Export Jobs":
+        st.header("📤 Export Jobs")
+        st.write(f"Writes jobs with their customer details to `{JOB_CSV_FILE}`"
+                 f"{' and a Parquet copy beside it' if pq is not None else ''}, oldest first.")
+        export_statuses = st.multiselect("Statuses", Job.VALID_STATUSES, default=Job.VALID_STATUSES, key="export_statuses")
+        use_dates = st.checkbox("Limit to a date range", key="export_use_dates")
+        start = end = None
+        if use_dates:
+            col1, col2 = st.columns(2)
+            start_date = col1.date_input("From", key="export_from")
+            end_date = col2.date_input("To (inclusive)", key="export_to")
+            start = datetime.combine(start_date, datetime.min.time())
+            end = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+        incremental = st.checkbox("Only jobs changed since the last incremental export", key="export_incremental")
+        include_archived = bool(manager.archive_manifest) and st.checkbox("Include archived seasons", key="export_archived")
+        if incremental:
+            last_export = load_export_state().get(
+                export_state_key(JOB_CSV_FILE, set(export_statuses), start, end, include_archived))
+            st.caption(f"Last incremental export with these filters: {last_export}" if last_export else
+                       "No incremental export with these filters yet: everything matching is exported.")
+
+        if st.button("Export"):
+            with st.spinner("Exporting..."):
+                result = export_jobs(manager, JOB_CSV_FILE, statuses=set(export_statuses), start=start, end=end,
+                                     incremental=incremental, include_archived=include_archived)
+            if result is not None:
+                st.session_state.last_job_export = result
+                st.success(f"Exported {result.rows} job(s) to {result.csv_path}"
+                           f"{f' and {result.parquet_path}' if result.parquet_path else ''}.")
+
+        result = st.session_state.get("last_job_export")
+        if result is not None and os.path.exists(result.csv_path):
+            # st.download_button copies the whole file into the server's media store, so a download is only
+            # built when asked for; it is dropped again after the next rerun instead of re-read on every one
+            downloads = [("CSV", result.csv_path, "text/csv")]
+            if result.parquet_path and os.path.exists(result.parquet_path):
+                downloads.append(("Parquet", result.parquet_path, "application/octet-stream"))
+            for col, (label, file_path, mime) in zip(st.columns(len(downloads)), downloads):
+                if col.button(f"Prepare {label} download", key=f"export_prepare_{label.lower()}"):
+                    with open(file_path, 'rb') as f:
+                        col.download_button(f"Download {label} ({file_size(file_path) / 1e6:.1f} MB)", f,
+                                            file_name=os.path.basename(file_path), mime=mime)
+
     # --- Manual Save Button in Sidebar ---
     st.sidebar.markdown("---")
     if st.sidebar.button("Save All Data Manually"):
         manager.save_all() # save_all now includes its own success message
 
+    # --- Google Sheets Sync Status ---
+    sync = get_sheet_sync()
+    if sync is not None and sync.standby:
+        st.sidebar.caption("Google Sheets: synced by another app process")
+    elif sync is not None:
+        if sync.retry_at:
+            retry_in = max(0, int(sync.retry_at - datetime.now().timestamp()))
+            st.sidebar.warning(f"Sheets sync retrying in {retry_in}s ({sync.last_error})")
+        last = sync.last_sync.strftime('%H:%M:%S') if sync.last_sync else "not yet"
+        st.sidebar.caption(f"Google Sheets: {sync.pending_count()} change(s) queued, last synced {last}")
+        if st.sidebar.button("Sync to Sheets Now"):
+            sync.sync_soon()
+
 # --- Main Execution for Streamlit ---
 if __name__ == "__main__":
     # Ensure data files exist or create them empty if they don't
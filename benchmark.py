@@ -0,0 +1,193 @@
+"""Times BoatHaulingManager on synthetic customers and jobs at 1k / 100k / 1M scale.
+
+Customers are resampled from Customers.csv.csv (boat type, length, draft, home coordinates, ECM flag) with a
+little jitter; jobs span the last few seasons with statuses that follow the calendar. Everything is written to
+a scratch directory, so the app's own data files are never touched.
+
+Usage: python benchmark.py [--scale 1k|100k|1m] [--customers N] [--jobs N] [--seasons N] [--keep DIR]
+"""
+import argparse
+import csv
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from streamlit import config as streamlit_config
+
+from Streamlit_app import (BOAT_TYPES, DATETIME_FORMAT, BoatHaulingManager, Customer, Job, JournaledStore,
+                           file_size, save_data)
+from routing import HARBOR_COORDINATES
+from tides import TideTable
+
+try:
+    import resource
+except ImportError: # Windows: no peak RSS figure
+    resource = None
+
+SCALES = {'1k': (250, 1000), '100k': (20000, 100000), '1m': (150000, 1000000)} # (customers, jobs)
+SAMPLE_CUSTOMERS_FILE = 'Customers.csv.csv'
+BOAT_MAKES = [("Boston Whaler", "Outrage"), ("Grady-White", "Canyon"), ("Sea Ray", "Sundancer"), ("Catalina", "30"),
+              ("Beneteau", "Oceanis"), ("Regulator", "34"), ("Hunter", "33"), ("Parker", "2520")]
+SERVICE_TYPES = ["Launch", "Haul Out", "Transport"]
+SEARCH_QUERIES = ["customer 12", "whaler", "scituate", "haul", "zzz-no-match"]
+STATUS_UPDATES = 100 # Journaled one at a time, the way the Update Job Status page does it
+
+# --- Synthetic data ---
+def load_profiles(path):
+    """(boat_type, length, draft, lat, lon, is_ecm) rows from the sample customer file, or None."""
+    try:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            return [(row['Boat Type'], float(row['Boat Length']), float(row['Boat Draft']), float(row['Home Latitude']),
+                     float(row['Home Longitude']), row['Is ECM Boat'].strip().lower() == 'true')
+                    for row in csv.DictReader(f)]
+    except (OSError, KeyError, ValueError):
+        return None
+
+def make_customer(rng, n, profiles):
+    if profiles:
+        boat_type, length, draft, lat, lon, is_ecm = rng.choice(profiles)
+        length = min(60.0, max(16.0, round(length + rng.uniform(-2, 2), 1)))
+        draft = min(10.0, max(1.0, round(draft + rng.uniform(-0.3, 0.3), 1)))
+        lat, lon = lat + rng.uniform(-0.01, 0.01), lon + rng.uniform(-0.01, 0.01)
+    else:
+        boat_type, length, draft = rng.choice(BOAT_TYPES), round(rng.uniform(20, 60), 1), round(rng.uniform(2, 10), 1)
+        lat, lon, is_ecm = rng.uniform(41.79, 42.33), rng.uniform(-70.99, -70.28), rng.random() < 0.15
+    make, model = rng.choice(BOAT_MAKES)
+    ramp = rng.choice(list(HARBOR_COORDINATES))
+    return Customer(f"Customer {n}", f"781-555-{n % 10000:04d}", f"customer{n}@example.com", f"{n} Shore Rd",
+                    make, model, length, boat_name=f"Boat {n}" if rng.random() < 0.5 else "",
+                    customer_id=str(uuid.UUID(int=rng.getrandbits(128))), boat_draft=draft, boat_type=boat_type,
+                    home_latitude=lat, home_longitude=lon, is_ecm_boat=is_ecm, ramp=ramp)
+
+def make_job(rng, customer, now, seasons):
+    # Launches in spring, hauls in the fall, on the hour or half hour in business hours
+    service = rng.choice(SERVICE_TYPES)
+    year = now.year - rng.randrange(seasons)
+    month = rng.randint(4, 6) if service == "Launch" else rng.randint(9, 11)
+    when = datetime(year, month, rng.randint(1, 28), rng.randint(8, 14), rng.choice((0, 30)))
+    days_ago = (now - when).days
+    if days_ago < -1:
+        status = "Scheduled" if rng.random() < 0.95 else "Cancelled"
+    elif days_ago <= 1:
+        status = rng.choice(["Scheduled", "In Progress"])
+    elif days_ago < 60:
+        status = rng.choice(["Completed", "Invoiced", "Invoiced", "Paid"])
+    else:
+        status = "Paid" if rng.random() < 0.9 else rng.choice(["Completed", "Cancelled"])
+    ramp = f"{customer.ramp} town ramp"
+    origin, destination = ("Home yard", ramp) if service == "Launch" else (ramp, "Home yard")
+    created = when - timedelta(days=rng.randint(7, 90))
+    updated = min(now, when + timedelta(days=rng.randint(0, 30))) if status != "Scheduled" else created
+    # Built as the saved dict directly: Job() would strptime every row, which dominates at 1M
+    return {'job_id': str(uuid.UUID(int=rng.getrandbits(128))), 'customer_id': customer.customer_id,
+            'service_type': service, 'scheduled_datetime': when.strftime(DATETIME_FORMAT), 'origin_location': origin,
+            'destination_location': destination, 'quoted_price': float(rng.randrange(250, 1500, 25)),
+            'status': status, 'notes': "Mast down" if customer.boat_type == "Sailboat MT" and rng.random() < 0.3 else "",
+            'created_at': created.strftime(DATETIME_FORMAT), 'updated_at': updated.strftime(DATETIME_FORMAT)}
+
+def generate(directory, n_customers, n_jobs, seasons, seed=7):
+    rng = random.Random(seed)
+    now = datetime.now()
+    profiles = load_profiles(os.path.join(os.path.dirname(os.path.abspath(__file__)), SAMPLE_CUSTOMERS_FILE))
+    customers = [make_customer(rng, n, profiles) for n in range(n_customers)]
+    jobs = {}
+    for _ in range(n_jobs):
+        data = make_job(rng, rng.choice(customers), now, seasons)
+        jobs[data['job_id']] = data
+    save_data({c.customer_id: c.to_dict() for c in customers}, os.path.join(directory, 'customers.json'))
+    save_data(jobs, os.path.join(directory, 'jobs.json'))
+
+def make_store(directory):
+    return JournaledStore(customer_file=os.path.join(directory, 'customers.json'),
+                          job_file=os.path.join(directory, 'jobs.json'),
+                          journal_file=os.path.join(directory, 'haulops.journal'),
+                          archive_dir=os.path.join(directory, 'job_archive'))
+
+# --- Timing ---
+def timed(results, name, fn, ops=1):
+    start = time.perf_counter()
+    value = fn()
+    elapsed = time.perf_counter() - start
+    results.append((name, elapsed, ops))
+    per_op = f"{elapsed / ops * 1000:10.3f} ms/op" if ops > 1 else ""
+    print(f"  {name:<48} {elapsed * 1000:10.1f} ms {per_op}")
+    return value
+
+def run(directory, n_customers, n_jobs, seasons):
+    results = []
+    print(f"{n_customers} customers, {n_jobs} jobs over {seasons} season(s) in {directory}")
+    timed(results, "generate + write snapshots", lambda: generate(directory, n_customers, n_jobs, seasons))
+    print(f"  snapshot size: {(file_size(os.path.join(directory, 'customers.json')) + file_size(os.path.join(directory, 'jobs.json'))) / 1e6:.1f} MB")
+
+    manager = timed(results, "load (all history in jobs.json)", lambda: BoatHaulingManager(make_store(directory)))
+    timed(results, "save_all (first: archives past seasons)", manager.save_all)
+    timed(results, "save_all (steady state)", manager.save_all)
+    manager = timed(results, "load (live jobs + archive manifest)", lambda: BoatHaulingManager(make_store(directory)))
+    print(f"  live jobs: {len(manager.jobs)}, archived: {manager.archived_job_count()}")
+
+    # List/View All Customers and Find Customer
+    timed(results, "customer list: sort by name", lambda: sorted(manager.all_customers(), key=lambda c: c.name))
+    timed(results, "customer list: search (name/email/boat)",
+          lambda: [manager.search_customers(q, fields=('name', 'email', 'boat_make', 'boat_model', 'boat_name'))
+                   for q in SEARCH_QUERIES], ops=len(SEARCH_QUERIES))
+    timed(results, "find customer: search (name/phone/email)",
+          lambda: [manager.search_customers(q, fields=('name', 'phone', 'email')) for q in SEARCH_QUERIES],
+          ops=len(SEARCH_QUERIES))
+
+    # List/View Jobs
+    tide_table = TideTable.load(os.path.dirname(os.path.abspath(__file__)))
+    timed(results, "job list: tide conflicts", lambda: manager.tide_conflicts(tide_table))
+    for status in ("Scheduled", "Paid"):
+        timed(results, f"job list: filter status={status}",
+              lambda: [j for j in manager.jobs_by_schedule(newest_first=True) if j.status == status])
+    timed(results, "job list: search, sort by date",
+          lambda: [sorted(manager.search_jobs(q, rank=False), key=lambda j: j.scheduled_datetime, reverse=True)
+                   for q in SEARCH_QUERIES], ops=len(SEARCH_QUERIES))
+    timed(results, "job list: search, best match",
+          lambda: [manager.search_jobs(q, rank=True) for q in SEARCH_QUERIES], ops=len(SEARCH_QUERIES))
+    timed(results, "job list: load archive (first include)", manager.load_archive)
+    timed(results, "job list: search incl. archive, best match",
+          lambda: [manager.search_jobs(q, rank=True, include_archived=True) for q in SEARCH_QUERIES],
+          ops=len(SEARCH_QUERIES))
+
+    # Update Job Status
+    live = [job for job in manager.live_jobs() if job.status in Job.ACTIVE_STATUSES][:STATUS_UPDATES]
+    if live:
+        timed(results, "status updates (journaled, fsync each)",
+              lambda: [manager.update_job_status(job, "Completed") for job in live], ops=len(live))
+    timed(results, "save_all (after updates)", manager.save_all)
+
+    read, written = manager.store.io_bytes()
+    print(f"  store I/O since last load: {read / 1e6:.1f} MB read, {written / 1e6:.1f} MB written")
+    if resource is not None:
+        print(f"  peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the app's data layer on synthetic data.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="1k", help="preset customer/job counts")
+    parser.add_argument("--customers", type=int, help="override the preset customer count")
+    parser.add_argument("--jobs", type=int, help="override the preset job count")
+    parser.add_argument("--seasons", type=int, default=4, help="seasons of job history, including this one")
+    parser.add_argument("--keep", metavar="DIR", help="generate into DIR and leave the files there")
+    args = parser.parse_args(argv)
+
+    # The data layer reports to the Streamlit sidebar; outside `streamlit run` that is a no-op, minus the nag
+    streamlit_config.set_option("global.showWarningOnDirectExecution", False)
+    n_customers, n_jobs = SCALES[args.scale]
+    directory = args.keep or tempfile.mkdtemp(prefix="haulops-bench-")
+    os.makedirs(directory, exist_ok=True)
+    try:
+        run(directory, args.customers or n_customers, args.jobs or n_jobs, max(1, args.seasons))
+    finally:
+        if not args.keep:
+            shutil.rmtree(directory, ignore_errors=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
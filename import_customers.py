@@ -0,0 +1,35 @@
+"""Bulk-loads customers from CSV files into customers.json / the journal.
+
+Usage: python import_customers.py Customers.csv.csv [more.csv ...] [--batch-size N]
+"""
+import argparse
+import sys
+
+from streamlit import config as streamlit_config
+
+from Streamlit_app import BoatHaulingManager, IMPORT_BATCH_SIZE, import_customers_csv
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import customers from CSV files.")
+    parser.add_argument("paths", nargs="+", help="CSV files with a 'Customer Name' header")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="customers per journal write")
+    args = parser.parse_args(argv)
+
+    # The data layer reports to the Streamlit sidebar; outside `streamlit run` that is a no-op, minus the nag
+    # that would otherwise land in the middle of the report
+    streamlit_config.set_option("global.showWarningOnDirectExecution", False)
+    manager = BoatHaulingManager()
+    failed = False
+    for path in args.paths:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            report = import_customers_csv(manager, f, batch_size=args.batch_size)
+        print(f"{path}: imported {report.imported}, skipped {report.duplicates} duplicate(s), {len(report.errors)} error(s)")
+        if report.ignored_columns:
+            print(f"  ignored column(s): {', '.join(report.ignored_columns)}")
+        for line_number, message in report.errors:
+            print(f"  line {line_number}: {message}")
+        failed = failed or bool(report.errors)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,350 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+# --- Configuration ---
+HOME_BASE = (42.0645, -70.7980) # 43 Mattakeeset Street, Pembroke, MA
+HARBOR_COORDINATES = {
+    'Brant Rock': (42.0890, -70.6470),
+    'Cohasset': (42.2440, -70.7905),
+    'Duxbury': (42.0420, -70.6700),
+    'Plymouth': (41.9584, -70.6620),
+    'Scituate': (42.1995, -70.7245),
+}
+# (truck, longest boat in ft it can carry). J17 is the crane truck and is scheduled alongside these, not instead.
+TRUCKS = [("S20/33", 60), ("S21/77", 50), ("S23/55", 30)]
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE_LATITUDE = 69.05
+CUSTOMER_GRID_CELL_MILES = 1.0
+HARBOR_GRID_CELL_MILES = 5.0
+AVERAGE_SPEED_MPH = 30
+DAY_START_MINUTES = 8 * 60         # Never before 8:00 AM
+LAST_START_MINUTES = 14 * 60 + 30  # Nothing starts after 2:30 PM
+POWERBOAT_SERVICE_MINUTES = 90
+SAILBOAT_SERVICE_MINUTES = 180
+MAX_IMPROVEMENT_PASSES = 50
+
+# One job on a day's route. start/end are (lat, lon) of pickup and drop-off; window is the
+# (earliest, latest) start in minutes after midnight, or None for business hours only.
+Stop = namedtuple('Stop', ['key', 'start', 'end', 'boat_length', 'service_minutes', 'window'])
+TruckRoute = namedtuple('TruckRoute', ['truck', 'stops', 'start_minutes', 'miles', 'late_minutes'])
+
+def service_minutes_for(boat_type):
+    return SAILBOAT_SERVICE_MINUTES if boat_type and 'sail' in str(boat_type).lower() else POWERBOAT_SERVICE_MINUTES
+
+def drop_off_offset_minutes(start, end, service_minutes):
+    """Minutes from a stop's start (pickup) until the truck is at its drop-off: loading, taken as half of the
+    handling time, plus the drive. A window that applies at the drop-off moves this much earlier."""
+    return service_minutes / 2 + haversine_miles(start, end) * 60.0 / AVERAGE_SPEED_MPH
+
+# --- Distances ---
+def haversine_matrix(lat1, lon1, lat2, lon2):
+    """Great-circle miles between every (lat1, lon1) point and every (lat2, lon2) point."""
+    lat1, lon1 = np.radians(np.asarray(lat1, dtype=float))[:, None], np.radians(np.asarray(lon1, dtype=float))[:, None]
+    lat2, lon2 = np.radians(np.asarray(lat2, dtype=float))[None, :], np.radians(np.asarray(lon2, dtype=float))[None, :]
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def haversine_miles(a, b):
+    return float(haversine_matrix([a[0]], [a[1]], [b[0]], [b[1]])[0, 0])
+
+# --- Spatial Index ---
+class GridIndex:
+    """Points bucketed into a uniform lat/lon grid, so radius and nearest-point queries only look at
+    nearby cells instead of every point. Cells are roughly `cell_miles` square around `reference_latitude`."""
+
+    def __init__(self, cell_miles=CUSTOMER_GRID_CELL_MILES, reference_latitude=HOME_BASE[0]):
+        self.cell_miles = cell_miles
+        self.cell_lat = cell_miles / MILES_PER_DEGREE_LATITUDE
+        self.cell_lon = cell_miles / (MILES_PER_DEGREE_LATITUDE * math.cos(math.radians(reference_latitude)))
+        self._cells = {}  # (row, col) -> {key: (lat, lon)}
+        self._points = {} # key -> (lat, lon)
+
+    def __len__(self):
+        return len(self._points)
+
+    def __contains__(self, key):
+        return key in self._points
+
+    def _cell(self, lat, lon):
+        return (math.floor(lat / self.cell_lat), math.floor(lon / self.cell_lon))
+
+    def insert(self, key, lat, lon):
+        self.remove(key)
+        point = (float(lat), float(lon))
+        self._points[key] = point
+        self._cells.setdefault(self._cell(*point), {})[key] = point
+
+    def remove(self, key):
+        point = self._points.pop(key, None)
+        if point is None:
+            return
+        cell = self._cell(*point)
+        members = self._cells[cell]
+        del members[key]
+        if not members:
+            del self._cells[cell]
+
+    def point(self, key):
+        return self._points.get(key)
+
+    def _cell_miles_at(self, lat):
+        # The shorter side of a cell at this latitude; a ring of r cells covers at least r times this
+        lon_miles = self.cell_lon * MILES_PER_DEGREE_LATITUDE * math.cos(math.radians(lat))
+        return min(self.cell_miles, lon_miles)
+
+    def _ring(self, center, radius):
+        row, col = center
+        if radius == 0:
+            yield center
+            return
+        for c in range(col - radius, col + radius + 1):
+            yield (row - radius, c)
+            yield (row + radius, c)
+        for r in range(row - radius + 1, row + radius):
+            yield (r, col - radius)
+            yield (r, col + radius)
+
+    def _measure(self, lat, lon, members):
+        keys = list(members)
+        coords = np.array([members[k] for k in keys], dtype=float)
+        return keys, haversine_matrix([lat], [lon], coords[:, 0], coords[:, 1])[0]
+
+    def within(self, lat, lon, miles):
+        """[(key, miles)] for every point within `miles` of (lat, lon), nearest first."""
+        if not self._points:
+            return []
+        center = self._cell(lat, lon)
+        rings = math.ceil(miles / self._cell_miles_at(lat)) + 1
+        candidates = {}
+        for radius in range(rings + 1):
+            for cell in self._ring(center, radius):
+                candidates.update(self._cells.get(cell, ()))
+        if not candidates:
+            return []
+        keys, distances = self._measure(lat, lon, candidates)
+        hits = np.flatnonzero(distances <= miles)
+        return [(keys[i], float(distances[i])) for i in hits[np.argsort(distances[hits], kind='stable')]]
+
+    def nearest(self, lat, lon, k=1):
+        """[(key, miles)] for the k points closest to (lat, lon), searching outward ring by ring."""
+        if not self._points:
+            return []
+        center = self._cell(lat, lon)
+        step = self._cell_miles_at(lat)
+        candidates = {}
+        radius = 0
+        while True:
+            for cell in self._ring(center, radius):
+                candidates.update(self._cells.get(cell, ()))
+            # Anything not yet seen is at least `radius * step` miles away
+            if len(candidates) >= min(k, len(self._points)):
+                keys, distances = self._measure(lat, lon, candidates)
+                order = np.argsort(distances, kind='stable')[:k]
+                if len(candidates) == len(self._points) or distances[order[-1]] <= radius * step:
+                    return [(keys[i], float(distances[i])) for i in order]
+            elif not candidates:
+                # Far from everything: jump straight to the ring that reaches the nearest occupied row/column
+                rows = [cell[0] for cell in self._cells]
+                cols = [cell[1] for cell in self._cells]
+                gap = max(min(rows) - center[0], center[0] - max(rows), min(cols) - center[1], center[1] - max(cols), 0)
+                radius = max(radius, gap - 1)
+            radius += 1
+
+def build_harbor_index(harbors=HARBOR_COORDINATES):
+    index = GridIndex(cell_miles=HARBOR_GRID_CELL_MILES)
+    for harbor, (lat, lon) in harbors.items():
+        index.insert(harbor, lat, lon)
+    return index
+
+def cluster_points(points, radius_miles, max_size=None):
+    """Splits {key: (lat, lon)} into geographic batches: points chained together by hops of at most
+    `radius_miles` share a batch, and batches over `max_size` are cut into nearest-first chunks.
+    Largest batches first."""
+    index = GridIndex(cell_miles=max(radius_miles, 0.1))
+    for key, (lat, lon) in points.items():
+        index.insert(key, lat, lon)
+
+    clusters, seen = [], set()
+    for key in points:
+        if key in seen:
+            continue
+        seen.add(key)
+        component, frontier = [key], [key]
+        while frontier:
+            lat, lon = index.point(frontier.pop())
+            for neighbour, _ in index.within(lat, lon, radius_miles):
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    component.append(neighbour)
+                    frontier.append(neighbour)
+        clusters.extend(_split_cluster(component, points, max_size))
+    clusters.sort(key=len, reverse=True)
+    return clusters
+
+def _split_cluster(keys, points, max_size):
+    if not max_size or len(keys) <= max_size:
+        return [keys]
+    coords = np.array([points[k] for k in keys], dtype=float)
+    remaining = np.arange(len(keys))
+    chunks = []
+    while len(remaining):
+        # Seed from the westernmost boat left, then take its nearest neighbours
+        seed = remaining[np.argmin(coords[remaining, 1])]
+        distances = haversine_matrix([coords[seed, 0]], [coords[seed, 1]], coords[remaining, 0], coords[remaining, 1])[0]
+        take = np.argsort(distances, kind='stable')[:max_size]
+        chunks.append([keys[i] for i in remaining[take]])
+        remaining = np.delete(remaining, take)
+    return chunks
+
+# --- Day Planning ---
+def plan_day(stops, trucks=TRUCKS, depot=HOME_BASE):
+    """Splits a day's stops across trucks by boat length and orders each truck's run.
+    Returns (routes, unassigned) where unassigned stops are too long for every truck."""
+    assigned = {truck: [] for truck, _ in trucks}
+    workload = {truck: 0 for truck, _ in trucks}
+    unassigned = []
+    # Longest boats first, since they have the fewest trucks to choose from; then the least-loaded truck that fits
+    for stop in sorted(stops, key=lambda s: -(s.boat_length or 0)):
+        fits = [truck for truck, max_length in trucks if (stop.boat_length or 0) <= max_length]
+        if not fits:
+            unassigned.append(stop)
+            continue
+        truck = min(fits, key=lambda t: workload[t])
+        assigned[truck].append(stop)
+        workload[truck] += stop.service_minutes
+
+    routes = []
+    for truck, _ in trucks:
+        if assigned[truck]:
+            routes.append(solve_route(truck, assigned[truck], depot))
+    return routes, unassigned
+
+def solve_route(truck, stops, depot=HOME_BASE):
+    """Orders one truck's stops: time-aware nearest neighbour, then 2-opt and or-opt moves that
+    shorten the run without adding lateness against the stops' windows."""
+    route = _RouteProblem(stops, depot)
+    order = route.improve(route.nearest_neighbour())
+    starts, late = route.schedule(order)
+    return TruckRoute(truck, [stops[i - 1] for i in order], starts, route.miles(order), late)
+
+class _RouteProblem:
+    # Node 0 is the depot, node i is stops[i - 1]. Moving from node a to node b drives from a's drop-off to
+    # b's pickup, so arc costs are asymmetric; the pickup -> drop-off leg of each job is a fixed cost.
+    def __init__(self, stops, depot):
+        starts = np.array([depot] + [s.start for s in stops], dtype=float)
+        ends = np.array([depot] + [s.end for s in stops], dtype=float)
+        self.arc = haversine_matrix(ends[:, 0], ends[:, 1], starts[:, 0], starts[:, 1])
+        job_miles = np.array([0.0] + [haversine_miles(s.start, s.end) for s in stops])
+        self.job_miles_total = float(job_miles.sum())
+        self.minutes_per_mile = 60.0 / AVERAGE_SPEED_MPH
+        self.busy = [0.0] + [s.service_minutes + m * self.minutes_per_mile for s, m in zip(stops, job_miles[1:])]
+        self.opens = [DAY_START_MINUTES] * (len(stops) + 1)
+        self.closes = [LAST_START_MINUTES] * (len(stops) + 1)
+        for i, stop in enumerate(stops, start=1):
+            if stop.window:
+                self.opens[i] = max(DAY_START_MINUTES, stop.window[0])
+                self.closes[i] = min(LAST_START_MINUTES, stop.window[1])
+        self.arc_rows = self.arc.tolist() # Plain lists are much faster than numpy for scalar lookups
+
+    def miles(self, order):
+        path = [0] + list(order) + [0]
+        return self.job_miles_total + sum(self.arc_rows[a][b] for a, b in zip(path, path[1:]))
+
+    def schedule(self, order):
+        """Start minute of each stop in `order` and total minutes started after a stop's window closed."""
+        clock, prev, late, starts = DAY_START_MINUTES, 0, 0.0, []
+        for node in order:
+            start = max(clock + self.arc_rows[prev][node] * self.minutes_per_mile, self.opens[node])
+            late += max(0.0, start - self.closes[node])
+            starts.append(start)
+            clock, prev = start + self.busy[node], node
+        return starts, late
+
+    def nearest_neighbour(self):
+        n = len(self.arc) - 1
+        closes = np.array(self.closes, dtype=float)
+        unvisited = np.ones(n + 1, dtype=bool)
+        unvisited[0] = False
+        order, clock, prev = [], DAY_START_MINUTES, 0
+        for _ in range(n):
+            arrive = clock + self.arc[prev] * self.minutes_per_mile
+            reachable = unvisited & (arrive <= closes)
+            # Nearest stop whose window we can still make; if none, the nearest of the rest
+            pool = reachable if reachable.any() else unvisited
+            node = int(np.argmin(np.where(pool, self.arc[prev], np.inf)))
+            order.append(node)
+            unvisited[node] = False
+            clock = max(arrive[node], self.opens[node]) + self.busy[node]
+            prev = node
+        return order
+
+    def improve(self, order):
+        _, late = self.schedule(order)
+        for _ in range(MAX_IMPROVEMENT_PASSES):
+            order, late, reversed_any = self._two_opt(order, late)
+            order, late, moved_any = self._or_opt(order, late)
+            if not (reversed_any or moved_any):
+                break
+        return order
+
+    def _accept(self, order, late):
+        new_late = self.schedule(order)[1]
+        return new_late if new_late <= late + 1e-9 else None
+
+    def _two_opt(self, order, late):
+        # Reversing path[i..j] swaps its two boundary arcs and runs the middle backwards; with prefix sums of the
+        # forward and backward arc costs along the path every j for a given i is scored in one vector operation.
+        n = len(order)
+        improved = False
+        i = 1
+        while i < n:
+            path = np.array([0] + order + [0])
+            pf = np.concatenate(([0.0], np.cumsum(self.arc[path[:-1], path[1:]])))
+            pr = np.concatenate(([0.0], np.cumsum(self.arc[path[1:], path[:-1]])))
+            j = np.arange(i + 1, n + 1)
+            delta = (self.arc[path[i - 1], path[j]] + self.arc[path[i], path[j + 1]] + (pr[j] - pr[i])
+                     - self.arc[path[i - 1], path[i]] - self.arc[path[j], path[j + 1]] - (pf[j] - pf[i]))
+            accepted = False
+            for k in np.argsort(delta)[:3]: # Best few only; the lateness check is the expensive part
+                if delta[k] >= -1e-9:
+                    break
+                jj = int(j[k])
+                candidate = order[:i - 1] + order[i - 1:jj][::-1] + order[jj:]
+                new_late = self._accept(candidate, late)
+                if new_late is not None:
+                    order, late, accepted, improved = candidate, new_late, True, True
+                    break
+            if not accepted:
+                i += 1
+        return order, late, improved
+
+    def _or_opt(self, order, late):
+        # Move a run of 1-3 consecutive stops (kept in order) to the cheapest other gap
+        n = len(order)
+        improved = False
+        gap_numbers = np.arange(n + 1)
+        for length in (1, 2, 3):
+            for i in range(1, n - length + 2):
+                path = np.array([0] + order + [0])
+                first, last = path[i], path[i + length - 1]
+                before, after = path[i - 1], path[i + length]
+                removal_gain = self.arc[before, first] + self.arc[last, after] - self.arc[before, after]
+                gaps = gap_numbers[(gap_numbers < i - 1) | (gap_numbers > i + length - 1)]
+                if not len(gaps):
+                    continue
+                a, b = path[gaps], path[gaps + 1]
+                insert_cost = self.arc[a, first] + self.arc[last, b] - self.arc[a, b]
+                k = int(np.argmin(insert_cost))
+                if insert_cost[k] - removal_gain >= -1e-9:
+                    continue
+                segment = order[i - 1:i - 1 + length]
+                rest = order[:i - 1] + order[i - 1 + length:]
+                gap = int(gaps[k])
+                insert_at = gap if gap < i - 1 else gap - length
+                candidate = rest[:insert_at] + segment + rest[insert_at:]
+                new_late = self._accept(candidate, late)
+                if new_late is not None:
+                    order, late, improved = candidate, new_late, True
+        return order, late, improved
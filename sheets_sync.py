@@ -0,0 +1,407 @@
+import json
+import os
+import random
+import threading
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError: # No process lock without it (Windows); every process then syncs on its own
+    fcntl = None
+
+try:
+    import gspread
+except ImportError: # Only the Google backend needs it; the fake backend and the engine don't
+    gspread = None
+
+# --- Configuration ---
+HEADER_ROW = 1
+MAX_ROWS_PER_REQUEST = 5000 # Rows per batched write; keeps each request well under the API payload limit
+SYNC_INTERVAL_SECONDS = 15 # Changes are collected for this long, then sent together
+MIN_BACKOFF_SECONDS = 5
+MAX_BACKOFF_SECONDS = 300
+
+class RateLimited(Exception):
+    """The sheet backend refused a call for quota reasons; retry later."""
+
+# --- Sheet Backends ---
+# A backend only needs two calls: read a whole sheet, and write several row ranges in one request.
+# Cells travel as strings in both directions, so what we read back compares equal to what we sent.
+class FakeSheetBackend:
+    """In-memory spreadsheet for tests and offline benchmarks. `calls` counts requests the way the Sheets
+    API would bill them; with rate_limit_every=n every n-th call raises RateLimited."""
+    def __init__(self, rate_limit_every=0):
+        self.sheets = {} # title -> list of rows, row 1 first
+        self.calls = 0
+        self.rows_written = 0
+        self.rate_limit_every = rate_limit_every
+
+    def _call(self):
+        self.calls += 1
+        if self.rate_limit_every and self.calls % self.rate_limit_every == 0:
+            raise RateLimited("fake quota exceeded")
+
+    def read_rows(self, sheet):
+        self._call()
+        return [list(row) for row in self.sheets.get(sheet, [])]
+
+    def write_ranges(self, sheet, updates):
+        """updates: [(first row number, [row, ...]), ...], all sent as one request."""
+        self._call()
+        rows = self.sheets.setdefault(sheet, [])
+        for first_row, values in updates:
+            last_row = first_row + len(values) - 1
+            rows.extend([] for _ in range(last_row - len(rows)))
+            rows[first_row - 1:last_row] = [list(row) for row in values]
+            self.rows_written += len(values)
+
+class GspreadBackend:
+    """Google Sheets through gspread. Worksheets are created (and grown) as needed."""
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+        self._worksheets = {}
+
+    @classmethod
+    def open(cls, spreadsheet_key, credentials_file):
+        if gspread is None:
+            raise RuntimeError("gspread is not installed")
+        with open(credentials_file, 'r') as f:
+            is_service_account = json.load(f).get('type') == 'service_account'
+        if is_service_account:
+            client = gspread.service_account(filename=credentials_file)
+        else:
+            # An OAuth client needs a one-time browser sign-in, which would wait forever on a headless server.
+            # Only reuse a sign-in saved by running gspread.oauth() once from a terminal.
+            token_file = gspread.auth.DEFAULT_AUTHORIZED_USER_FILENAME
+            if not os.path.exists(token_file):
+                raise RuntimeError(f"{credentials_file} is an OAuth client and there is no saved sign-in at {token_file}; "
+                                   "sign in once from a terminal or use a service account key")
+            client = gspread.oauth(credentials_filename=credentials_file, authorized_user_filename=token_file)
+        return cls(client.open_by_key(spreadsheet_key))
+
+    def _worksheet(self, sheet):
+        worksheet = self._worksheets.get(sheet)
+        if worksheet is None:
+            try:
+                worksheet = self.spreadsheet.worksheet(sheet)
+            except gspread.exceptions.WorksheetNotFound:
+                worksheet = self.spreadsheet.add_worksheet(sheet, rows=1000, cols=26)
+            self._worksheets[sheet] = worksheet
+        return worksheet
+
+    def read_rows(self, sheet):
+        return self._guard(lambda: self._worksheet(sheet).get_all_values())
+
+    def write_ranges(self, sheet, updates):
+        def write():
+            worksheet = self._worksheet(sheet)
+            last_row = max(first_row + len(values) - 1 for first_row, values in updates)
+            width = max(len(row) for _, values in updates for row in values)
+            if last_row > worksheet.row_count:
+                worksheet.add_rows(last_row - worksheet.row_count)
+            if width > worksheet.col_count:
+                worksheet.add_cols(width - worksheet.col_count)
+            worksheet.batch_update([{'range': f"A{first_row}:{column_letter(width)}{first_row + len(values) - 1}",
+                                     'values': values} for first_row, values in updates], value_input_option='RAW')
+        self._guard(write)
+
+    @staticmethod
+    def _guard(call):
+        try:
+            return call()
+        except gspread.exceptions.APIError as e:
+            if getattr(e.response, 'status_code', None) in (429, 503):
+                raise RateLimited(str(e)) from e
+            raise
+
+def column_letter(n):
+    """1 -> A, 27 -> AA."""
+    letters = ''
+    while n:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(ord('A') + rem) + letters
+    return letters
+
+def cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    return str(value)
+
+# --- Sync Engine ---
+class SheetSync:
+    """One-way delta sync of record tables to sheets.
+
+    tables: kind -> (sheet title, columns); columns[0] is the record ID attribute. source(): kind -> iterable
+    of records (objects with those attributes), read for full passes. Between full passes the manager reports
+    each change through notify(); changes are coalesced per record and sent as batched range writes.
+    Deleted records leave a blank row that the next new record reuses. A full pass also blanks rows whose
+    record is no longer in source(), except for the kinds in keep_unlisted: there only an explicit
+    notify(kind, id, None) removes a row, so records the source leaves out (archived history) stay put.
+
+    Pass backend=None and open_backend() to connect lazily: the backend is then opened by the first sync,
+    on the worker thread, and a failure is retried with the same backoff as any other sync error.
+
+    Rows are handed out from what this engine last read of the sheet, so two engines writing one sheet would
+    give different records the same row. With lock_file, only the engine holding a non-blocking flock on it
+    syncs; the others stand by, drop their change log and try for the lock again on every sync. The holder
+    calls refresh() before each sync to pull in the other processes' changes, and a newly elected holder
+    re-reads the sheet and makes a full pass."""
+
+    def __init__(self, backend, tables, source, interval=SYNC_INTERVAL_SECONDS, open_backend=None, keep_unlisted=(),
+                 lock_file=None, refresh=None):
+        self.backend = backend
+        self.open_backend = open_backend
+        self.tables = tables
+        self.keep_unlisted = frozenset(keep_unlisted)
+        self.source = source
+        self.interval = interval
+        self.lock_file = lock_file
+        self.refresh = refresh
+        self.standby = False   # Another process holds lock_file and does the syncing
+        self._lock_handle = None
+        self._lock = threading.Lock()
+        self._pending = {}     # (kind, record ID) -> row tuple, or None for a deletion
+        self._full_pass = True # Compare every record against the sheet before trusting the change log
+        self._mirror = None    # kind -> {record ID: (row number, updated_at, hash of row)}, as on the sheet
+        self._free_rows = {}   # kind -> blank row numbers
+        self._next_row = {}    # kind -> first row past the end of the data
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_sync = None
+        self.last_error = None
+        self.retry_at = None
+        self.rows_sent = 0
+        self.requests = 0
+
+    # --- Change log ---
+    def notify(self, kind, record_id, record):
+        """Manager change listener. kind None means "anything may have changed" (a full reload)."""
+        if kind is None:
+            with self._lock:
+                self._full_pass = True
+            return
+        if kind not in self.tables:
+            return
+        row = self._row(kind, record) if record is not None else None
+        with self._lock:
+            self._pending[(kind, record_id)] = row
+
+    def pending_count(self):
+        return len(self._pending)
+
+    def _row(self, kind, record):
+        return tuple(cell(getattr(record, column, None)) for column in self.tables[kind][1])
+
+    # --- Background worker ---
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="sheet-sync", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._release_election()
+
+    def sync_soon(self):
+        self._wake.set()
+
+    def _run(self):
+        backoff = 0
+        while not self._stop.is_set():
+            if backoff:
+                self._stop.wait(backoff)
+            else:
+                self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.sync_once()
+                backoff = 0
+                self.retry_at = None
+            except Exception as e: # Network or quota trouble must not kill the worker; the changes stay queued
+                backoff = min(MAX_BACKOFF_SECONDS, max(MIN_BACKOFF_SECONDS, backoff * 2))
+                backoff *= random.uniform(0.8, 1.2) # Spread out retries from several app processes
+                self.last_error = f"{type(e).__name__}: {e}"
+                self.retry_at = datetime.now().timestamp() + backoff
+
+    # --- Syncing ---
+    def sync_once(self):
+        """Sends everything changed since the last successful sync. Raises RateLimited (or the backend's
+        error) with the unsent changes still queued. Returns the number of rows written; 0 on standby."""
+        if not self._win_election():
+            with self._lock: # The elected process sends these from its own copy of the data
+                self._pending = {}
+                self._full_pass = True
+            return 0
+        if self.refresh is not None:
+            self.refresh()
+        if self.backend is None:
+            self.backend = self.open_backend()
+        with self._lock:
+            full_pass, self._full_pass = self._full_pass, False
+            pending, self._pending = self._pending, {}
+        try:
+            if self._mirror is None:
+                self._read_mirror()
+            if full_pass:
+                pending = self._diff_all()
+            written = 0
+            for kind in self.tables:
+                written += self._send(kind, {rid: row for (k, rid), row in pending.items() if k == kind})
+        except Exception:
+            with self._lock:
+                if full_pass:
+                    self._full_pass = True
+                for key, row in pending.items():
+                    self._pending.setdefault(key, row) # Anything re-changed meanwhile is newer; keep that
+            raise
+        self.last_sync = datetime.now()
+        self.last_error = None
+        return written
+
+    # --- Election ---
+    def _win_election(self):
+        """True while this engine holds lock_file (or needs none). Winning starts over from the sheet."""
+        if self.lock_file is None or fcntl is None or self._lock_handle is not None:
+            return True
+        handle = open(self.lock_file, 'a')
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            self.standby = True
+            return False
+        self._lock_handle = handle
+        self.standby = False
+        self._mirror = None # The previous holder may have added rows since this engine last looked
+        with self._lock:
+            self._full_pass = True
+        return True
+
+    def _release_election(self):
+        if self._lock_handle is not None:
+            fcntl.flock(self._lock_handle, fcntl.LOCK_UN)
+            self._lock_handle.close()
+            self._lock_handle = None
+
+    def _read_mirror(self):
+        mirror = {}
+        for kind, (sheet, columns) in self.tables.items():
+            rows = self.backend.read_rows(sheet)
+            entries, free = {}, []
+            header_ok = bool(rows) and tuple(rows[0][:len(columns)]) == tuple(columns)
+            updated_col = columns.index('updated_at') if 'updated_at' in columns else None
+            for row_number, row in enumerate(rows[HEADER_ROW:], start=HEADER_ROW + 1):
+                row = tuple(row[:len(columns)]) + ('',) * (len(columns) - len(row))
+                if header_ok and row[0]:
+                    entries[row[0]] = (row_number, row[updated_col] if updated_col is not None else None, hash(row))
+                elif any(row):
+                    entries[('stale', row_number)] = (row_number, None, None) # Unknown layout: blank it
+                else:
+                    free.append(row_number)
+            if not header_ok:
+                entries[('header',)] = (HEADER_ROW, None, None)
+            mirror[kind] = entries
+            self._free_rows[kind] = sorted(free, reverse=True) # pop() hands out the lowest row first
+            self._next_row[kind] = max(len(rows) + 1, HEADER_ROW + 1)
+        self._mirror = mirror
+
+    def _diff_all(self):
+        """Change log equivalent to the difference between the records and the sheet."""
+        changes = {}
+        for kind, records in self.source().items():
+            if kind not in self.tables:
+                continue
+            entries = self._mirror[kind]
+            seen = set()
+            updated_col = 'updated_at' in self.tables[kind][1]
+            for record in list(records):
+                record_id = getattr(record, self.tables[kind][1][0])
+                seen.add(record_id)
+                entry = entries.get(record_id)
+                if entry is not None and updated_col and entry[1] == cell(record.updated_at):
+                    continue # Every job change stamps updated_at, so a matching stamp means an unchanged row
+                row = self._row(kind, record)
+                if entry is None or entry[2] != hash(row):
+                    changes[(kind, record_id)] = row
+            for record_id in entries:
+                if record_id not in seen and (kind not in self.keep_unlisted or isinstance(record_id, tuple)):
+                    changes[(kind, record_id)] = None # Stale rows of an unknown layout go regardless
+        return changes
+
+    def _send(self, kind, changes):
+        sheet, columns = self.tables[kind]
+        entries = self._mirror[kind]
+        updated_col = columns.index('updated_at') if 'updated_at' in columns else None
+        blank = ('',) * len(columns)
+        if ('header',) in entries:
+            changes[('header',)] = None
+
+        # Plan every row write, then apply each batch to the mirror once the sheet has accepted it
+        writes = {} # row number -> (record ID, row or None)
+        for record_id, row in changes.items():
+            entry = entries.get(record_id)
+            if record_id == ('header',):
+                writes[HEADER_ROW] = (record_id, tuple(columns))
+            elif row is None:
+                if entry is not None:
+                    writes[entry[0]] = (record_id, None)
+            elif entry is not None:
+                if entry[2] != hash(row):
+                    writes[entry[0]] = (record_id, row)
+            else:
+                writes[self._allocate_row(kind)] = (record_id, row)
+        if not writes:
+            return 0
+
+        row_numbers = sorted(writes)
+        sent = 0
+        try:
+            for start in range(0, len(row_numbers), MAX_ROWS_PER_REQUEST):
+                batch = row_numbers[start:start + MAX_ROWS_PER_REQUEST]
+                self.backend.write_ranges(sheet, [(first, [list(writes[n][1] or blank) for n in run])
+                                                  for first, run in _consecutive_runs(batch)])
+                self.requests += 1
+                for row_number in batch:
+                    record_id, row = writes[row_number]
+                    if record_id == ('header',) or row is None:
+                        entries.pop(record_id, None)
+                        if row is None:
+                            self._free_rows[kind].append(row_number)
+                    else:
+                        entries[record_id] = (row_number, row[updated_col] if updated_col is not None else None, hash(row))
+                sent += len(batch)
+        finally:
+            # Rows handed to records that never reached the sheet go back to the pool
+            for row_number in row_numbers[sent:]:
+                record_id, row = writes[row_number]
+                if row is not None and record_id not in entries:
+                    self._free_rows[kind].append(row_number)
+            self._free_rows[kind].sort(reverse=True)
+            self.rows_sent += sent
+        return sent
+
+    def _allocate_row(self, kind):
+        if self._free_rows[kind]:
+            return self._free_rows[kind].pop()
+        row_number = self._next_row[kind]
+        self._next_row[kind] += 1
+        return row_number
+
+def _consecutive_runs(row_numbers):
+    """Sorted row numbers -> [(first row, [row numbers])] with each run contiguous, i.e. one A1 range."""
+    runs = []
+    for n in row_numbers:
+        if runs and n == runs[-1][1][-1] + 1:
+            runs[-1][1].append(n)
+        else:
+            runs.append((n, [n]))
+    return runs
@@ -0,0 +1,103 @@
+import json
+import os
+from datetime import datetime
+
+import Streamlit_app as app
+from Streamlit_app import BoatHaulingManager, Customer, Job, JournaledStore
+
+PAST_SEASON = str(datetime.now().year - 2)
+THIS_SEASON = str(datetime.now().year)
+
+
+def make_store(tmp_path):
+    return JournaledStore(customer_file=str(tmp_path / 'customers.json'), job_file=str(tmp_path / 'jobs.json'),
+                          journal_file=str(tmp_path / 'haulops.journal'), archive_dir=str(tmp_path / 'job_archive'))
+
+
+def make_manager(tmp_path):
+    """A customer with two closed jobs and one open job from a past season, and one closed job from this one."""
+    manager = BoatHaulingManager(make_store(tmp_path))
+    customer = Customer("Skipper", "781-555-0100", "skipper@example.com", "", "Whaler", "Outrage", 22,
+                        customer_id='cust-1')
+    manager.add_customer(customer)
+    for job_id, season, status, price in [('old-paid', PAST_SEASON, "Paid", 450), ('old-cancelled', PAST_SEASON, "Cancelled", 300),
+                                          ('old-open', PAST_SEASON, "Scheduled", 400), ('new-paid', THIS_SEASON, "Paid", 500)]:
+        manager.add_job(Job('cust-1', "Haul Out", f"{season}-10-15 09:30", "Scituate town ramp", "Home yard", price,
+                            job_id=job_id, status=status))
+    return manager
+
+
+def totals(manager):
+    metrics = manager.metrics
+    return (dict(metrics.status_counts), {s: metrics.revenue(s) for s in Job.VALID_STATUSES},
+            dict(metrics.jobs_per_day), metrics.total_jobs())
+
+
+def read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def test_save_all_archives_closed_jobs_from_past_seasons(tmp_path):
+    manager = make_manager(tmp_path)
+    assert manager.save_all()
+
+    assert sorted(read_json(tmp_path / 'jobs.json')) == ['new-paid', 'old-open']
+    assert sorted(read_json(tmp_path / 'job_archive' / f"jobs_{PAST_SEASON}.json")) == ['old-cancelled', 'old-paid']
+    assert read_json(tmp_path / 'job_archive' / 'manifest.json')[PAST_SEASON]['jobs'] == 2
+    assert sorted(job.job_id for job in manager.live_jobs()) == ['new-paid', 'old-open']
+    assert manager.archived_job_count() == 2
+
+
+def test_metrics_count_archived_jobs_through_the_season_summary(tmp_path):
+    manager = make_manager(tmp_path)
+    before = totals(manager)
+    manager.save_all()
+
+    assert totals(manager) == before
+    reloaded = BoatHaulingManager(make_store(tmp_path))
+    assert sorted(reloaded.jobs) == ['new-paid', 'old-open']
+    assert totals(reloaded) == before
+
+
+def test_edited_archived_job_is_live_and_counted_once(tmp_path):
+    manager = make_manager(tmp_path)
+    manager.save_all()
+    manager.load_archive()
+    assert manager.is_archived('old-cancelled')
+    before = totals(manager)
+
+    assert manager.update_job_status(manager.jobs['old-cancelled'], "Scheduled")
+    expected = totals(manager)
+    assert expected[3] == before[3]
+    assert expected[0]["Cancelled"] == before[0]["Cancelled"] - 1
+    assert not manager.is_archived('old-cancelled')
+    assert sorted(read_json(tmp_path / 'job_archive' / f"jobs_{PAST_SEASON}.json")) == ['old-paid']
+
+    reloaded = BoatHaulingManager(make_store(tmp_path))
+    assert sorted(job.job_id for job in reloaded.live_jobs()) == ['new-paid', 'old-cancelled', 'old-open']
+    assert totals(reloaded) == expected
+    reloaded.load_archive()
+    assert sorted(reloaded.jobs) == ['new-paid', 'old-cancelled', 'old-open', 'old-paid']
+    assert totals(reloaded) == expected
+
+
+def test_failed_partition_write_keeps_the_jobs_in_jobs_json(tmp_path, monkeypatch):
+    manager = make_manager(tmp_path)
+    before = totals(manager)
+    save_data = app.save_data
+
+    def failing_partition_write(data, file_path):
+        if os.path.basename(file_path).startswith('jobs_'):
+            return False
+        return save_data(data, file_path)
+
+    monkeypatch.setattr(app, 'save_data', failing_partition_write)
+    assert manager.save_all()
+
+    assert sorted(read_json(tmp_path / 'jobs.json')) == ['new-paid', 'old-cancelled', 'old-open', 'old-paid']
+    assert not os.path.exists(tmp_path / 'job_archive' / f"jobs_{PAST_SEASON}.json")
+    assert len(manager.live_jobs()) == 4
+    assert manager.archived_job_count() == 0
+    monkeypatch.undo()
+    assert totals(BoatHaulingManager(make_store(tmp_path))) == before
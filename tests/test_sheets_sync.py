@@ -0,0 +1,170 @@
+from types import SimpleNamespace
+
+import pytest
+
+from sheets_sync import FakeSheetBackend, RateLimited, SheetSync
+
+TABLES = {'job': ('Jobs', ('job_id', 'status', 'updated_at'))}
+
+
+def make_job(n, status="Scheduled", updated_at="2025-05-01 09:00"):
+    return SimpleNamespace(job_id=f"job-{n}", status=status, updated_at=updated_at)
+
+
+def make_sync(backend, jobs, **kwargs):
+    return SheetSync(backend, TABLES, lambda: {'job': list(jobs.values())}, **kwargs)
+
+
+def test_first_sync_writes_header_and_every_record_in_one_request():
+    backend = FakeSheetBackend()
+    jobs = {job.job_id: job for job in (make_job(n) for n in range(3))}
+    sync = make_sync(backend, jobs)
+
+    assert sync.sync_once() == 4
+    assert backend.sheets['Jobs'] == [['job_id', 'status', 'updated_at'],
+                                      ['job-0', 'Scheduled', '2025-05-01 09:00'],
+                                      ['job-1', 'Scheduled', '2025-05-01 09:00'],
+                                      ['job-2', 'Scheduled', '2025-05-01 09:00']]
+    assert backend.calls == 2 # One read of the sheet, one batched write
+
+
+def test_delta_sync_only_sends_changed_rows():
+    backend = FakeSheetBackend()
+    jobs = {job.job_id: job for job in (make_job(n) for n in range(100))}
+    sync = make_sync(backend, jobs)
+    sync.sync_once()
+    rows_before, calls_before = backend.rows_written, backend.calls
+
+    changed = make_job(42, status="Completed", updated_at="2025-05-02 10:00")
+    jobs[changed.job_id] = changed
+    sync.notify('job', changed.job_id, changed)
+
+    assert sync.sync_once() == 1
+    assert backend.rows_written - rows_before == 1
+    assert backend.calls - calls_before == 1
+    assert backend.sheets['Jobs'][43] == ['job-42', 'Completed', '2025-05-02 10:00']
+
+
+def test_deleted_record_blanks_its_row_and_the_next_record_reuses_it():
+    backend = FakeSheetBackend()
+    jobs = {job.job_id: job for job in (make_job(n) for n in range(3))}
+    sync = make_sync(backend, jobs)
+    sync.sync_once()
+
+    del jobs['job-1']
+    sync.notify('job', 'job-1', None)
+    sync.sync_once()
+    assert backend.sheets['Jobs'][2] == ['', '', '']
+
+    new_job = make_job(9)
+    jobs[new_job.job_id] = new_job
+    sync.notify('job', new_job.job_id, new_job)
+    sync.sync_once()
+    assert backend.sheets['Jobs'][2] == ['job-9', 'Scheduled', '2025-05-01 09:00']
+    assert len(backend.sheets['Jobs']) == 4
+
+
+def test_rate_limited_changes_stay_queued_until_the_next_sync():
+    backend = FakeSheetBackend()
+    jobs = {job.job_id: job for job in (make_job(n) for n in range(3))}
+    sync = make_sync(backend, jobs)
+    sync.sync_once()
+
+    backend.rate_limit_every = backend.calls + 1 # Refuse the very next call
+    changed = make_job(0, status="In Progress")
+    sync.notify('job', changed.job_id, changed)
+    with pytest.raises(RateLimited):
+        sync.sync_once()
+    assert sync.pending_count() == 1
+
+    backend.rate_limit_every = 0
+    assert sync.sync_once() == 1
+    assert sync.pending_count() == 0
+    assert backend.sheets['Jobs'][1][1] == "In Progress"
+
+
+def test_backend_is_opened_by_the_first_sync_and_retried_after_a_failure():
+    backend = FakeSheetBackend()
+    attempts = []
+
+    def open_backend():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("no saved sign-in")
+        return backend
+
+    jobs = {'job-0': make_job(0)}
+    sync = make_sync(None, jobs, open_backend=open_backend)
+    assert not attempts # Nothing is opened until the worker syncs
+
+    with pytest.raises(RuntimeError):
+        sync.sync_once()
+    assert sync.sync_once() == 2
+    assert len(attempts) == 2
+    assert backend.sheets['Jobs'][1] == ['job-0', 'Scheduled', '2025-05-01 09:00']
+
+
+def test_full_pass_keeps_rows_of_unlisted_records_when_asked():
+    backend = FakeSheetBackend()
+    jobs = {job.job_id: job for job in (make_job(n) for n in range(3))}
+    sync = make_sync(backend, jobs, keep_unlisted=('job',))
+    sync.sync_once()
+
+    del jobs['job-1'] # Archived: gone from the source, but not deleted
+    sync.notify(None, None, None)
+    sync.sync_once()
+    assert backend.sheets['Jobs'][2] == ['job-1', 'Scheduled', '2025-05-01 09:00']
+
+    sync.notify('job', 'job-1', None)
+    sync.sync_once()
+    assert backend.sheets['Jobs'][2] == ['', '', '']
+
+
+def test_full_pass_blanks_rows_of_unlisted_records_by_default():
+    backend = FakeSheetBackend()
+    jobs = {job.job_id: job for job in (make_job(n) for n in range(3))}
+    sync = make_sync(backend, jobs)
+    sync.sync_once()
+
+    del jobs['job-1']
+    sync.notify(None, None, None)
+    sync.sync_once()
+    assert backend.sheets['Jobs'][2] == ['', '', '']
+
+
+def test_only_the_engine_holding_the_lock_writes_the_sheet(tmp_path):
+    # Two app processes: each engine reads its own copy of the data, which the journal keeps in step
+    backend = FakeSheetBackend()
+    lock_file = str(tmp_path / '.sheets_sync.lock')
+    jobs_a = {job.job_id: job for job in (make_job(n) for n in range(3))}
+    jobs_b = dict(jobs_a)
+    first = make_sync(backend, jobs_a, lock_file=lock_file, refresh=lambda: jobs_a.update(jobs_b))
+    second = make_sync(backend, jobs_b, lock_file=lock_file, refresh=lambda: jobs_b.update(jobs_a))
+    assert first.sync_once() == 4
+
+    # A record added in the standby process goes to the sheet through the elected one
+    added = make_job(3)
+    jobs_b[added.job_id] = added
+    second.notify('job', added.job_id, added)
+    assert second.sync_once() == 0
+    assert second.standby and second.pending_count() == 0
+    first.notify('job', added.job_id, added) # What the journal catch-up reports
+    assert first.sync_once() == 1
+
+    # The elected process goes away; the other takes over from the sheet as it is, not as it last saw it
+    first.stop()
+    for n in (4, 5):
+        jobs_b[f"job-{n}"] = make_job(n)
+        second.notify('job', f"job-{n}", jobs_b[f"job-{n}"])
+    assert second.sync_once() == 2
+    assert not second.standby
+
+    # Handed back, the first engine must not reuse the rows it thought were free when it stopped
+    second.stop()
+    jobs_a[added.job_id] = added
+    jobs_a['job-6'] = make_job(6)
+    first.notify('job', 'job-6', jobs_a['job-6'])
+    first.sync_once()
+
+    job_ids = [row[0] for row in backend.sheets['Jobs'][1:]]
+    assert job_ids == [f"job-{n}" for n in range(7)]
@@ -0,0 +1,145 @@
+import json
+
+import pytest
+
+import Streamlit_app as app
+from Streamlit_app import BoatHaulingManager, Customer, Job, JournaledStore
+
+
+def make_store(tmp_path, compact_threshold=100):
+    return JournaledStore(customer_file=str(tmp_path / 'customers.json'), job_file=str(tmp_path / 'jobs.json'),
+                          journal_file=str(tmp_path / 'haulops.journal'), compact_threshold=compact_threshold,
+                          archive_dir=str(tmp_path / 'job_archive'))
+
+
+def customer_data(n):
+    return Customer(f"Customer {n}", "781-555-0100", f"c{n}@example.com", "", "Whaler", "Outrage", 22,
+                    customer_id=f"cust-{n}").to_dict()
+
+
+def test_load_replays_the_journal_over_the_snapshots(tmp_path):
+    store = make_store(tmp_path)
+    store.load()
+    store.compact({'cust-1': customer_data(1), 'cust-2': customer_data(2)}, {})
+
+    renamed = dict(customer_data(1), name="Renamed")
+    store.append_many([('customer', 'cust-1', renamed), ('customer', 'cust-2', None),
+                       ('customer', 'cust-3', customer_data(3))])
+
+    customers, jobs = make_store(tmp_path).load()
+    assert customers == {'cust-1': renamed, 'cust-3': customer_data(3)}
+    assert jobs == {}
+
+
+def test_torn_final_record_is_dropped_and_cut_off(tmp_path):
+    store = make_store(tmp_path)
+    store.load()
+    store.append_many([('customer', 'cust-1', customer_data(1))])
+    good_size = (tmp_path / 'haulops.journal').stat().st_size
+    with open(tmp_path / 'haulops.journal', 'ab') as f:
+        f.write(b'{"op":"put","kind":"customer","id":"cust-2","da') # Crash mid-append
+
+    reader = make_store(tmp_path)
+    customers, _ = reader.load()
+    assert list(customers) == ['cust-1']
+    assert (tmp_path / 'haulops.journal').stat().st_size == good_size
+
+    # The next append starts on a clean line, so it replays
+    reader.append_many([('customer', 'cust-3', customer_data(3))])
+    customers, _ = make_store(tmp_path).load()
+    assert list(customers) == ['cust-1', 'cust-3']
+
+
+def test_compaction_folds_the_journal_into_the_snapshots(tmp_path):
+    store = make_store(tmp_path, compact_threshold=2)
+    store.load()
+    store.append_many([('customer', 'cust-1', customer_data(1)), ('customer', 'cust-2', customer_data(2))])
+    assert store.needs_compaction()
+
+    customers, jobs = make_store(tmp_path).load()
+    _, saved = store.compact(customers, jobs)
+    assert saved
+    assert (tmp_path / 'haulops.journal').stat().st_size == 0
+    assert not store.needs_compaction()
+    assert json.loads((tmp_path / 'customers.json').read_text()) == customers
+
+
+def test_failed_snapshot_write_keeps_the_journal(tmp_path, monkeypatch):
+    manager = BoatHaulingManager(make_store(tmp_path, compact_threshold=3))
+    monkeypatch.setattr(app, 'save_data', lambda data, file_path: False)
+    for n in range(3): # The third add triggers a compaction, which fails
+        manager.add_customer(Customer.from_saved_dict(customer_data(n)))
+
+    assert (tmp_path / 'haulops.journal').stat().st_size > 0
+    monkeypatch.undo()
+    assert sorted(BoatHaulingManager(make_store(tmp_path)).customers) == ['cust-0', 'cust-1', 'cust-2']
+
+
+def test_failed_journal_write_is_undone_in_memory(tmp_path, monkeypatch):
+    manager = BoatHaulingManager(make_store(tmp_path))
+    customer = Customer.from_saved_dict(customer_data(1))
+    manager.add_customer(customer)
+    job = Job(customer.customer_id, "Launch", "2025-05-01 10:00", "Scituate town ramp", "Home yard", 400)
+    manager.add_job(job)
+
+    monkeypatch.setattr(manager.store, 'append_many', lambda changes: False)
+    assert not manager.add_customer(Customer.from_saved_dict(customer_data(2)))
+    assert not manager.update_job_status(job, "Completed")
+    assert list(manager.customers) == ['cust-1']
+    assert job.status == "Scheduled"
+    assert manager.metrics.status_counts["Scheduled"] == 1
+    assert manager.metrics.status_counts["Completed"] == 0
+
+
+def test_other_writers_records_are_caught_up(tmp_path):
+    mine, theirs = make_store(tmp_path), make_store(tmp_path)
+    mine.load()
+    theirs.load()
+    theirs.append_many([('customer', 'cust-1', customer_data(1))])
+
+    assert mine.changed_on_disk()
+    with mine.lock():
+        records = mine.read_new_records()
+    assert [record['id'] for record in records] == ['cust-1']
+    assert not mine.changed_on_disk()
+
+
+def test_foreign_compaction_asks_for_a_full_reload(tmp_path):
+    mine, theirs = make_store(tmp_path), make_store(tmp_path)
+    mine.load()
+    customers, jobs = theirs.load()
+    theirs.append_many([('customer', 'cust-1', customer_data(1))])
+    customers['cust-1'] = customer_data(1)
+    theirs.compact(customers, jobs)
+
+    with mine.lock():
+        assert mine.read_new_records() is None
+
+    manager = BoatHaulingManager(make_store(tmp_path))
+    other = BoatHaulingManager(make_store(tmp_path))
+    other.add_customer(Customer.from_saved_dict(customer_data(2)))
+    other.save_all()
+    manager.refresh()
+    assert sorted(manager.customers) == ['cust-1', 'cust-2']
+    assert [c.customer_id for c in manager.search_customers("customer 2")] == ['cust-2']
+
+
+@pytest.mark.parametrize('indent', [4, None])
+def test_pre_journal_snapshots_stay_loadable(tmp_path, indent):
+    # What the app wrote before the journal: json.dump(indent=4) of each object's __dict__
+    legacy_customer = {'customer_id': 'cust-1', 'name': "Old Timer", 'phone': "781-555-0199", 'email': "old@example.com",
+                       'address': "1 Dock St", 'boat_make': "Grady-White", 'boat_model': "Canyon", 'boat_length': 26.0,
+                       'boat_name': ""}
+    legacy_job = {'job_id': 'job-1', 'customer_id': 'cust-1', 'service_type': "Haul Out",
+                  'scheduled_datetime': "2025-10-15 09:30", 'origin_location': "Scituate town ramp",
+                  'destination_location': "Home yard", 'quoted_price': 450.0, 'notes': "", 'status': "Scheduled",
+                  'created_at': "2025-09-01 12:00", 'updated_at': "2025-09-01 12:00"}
+    (tmp_path / 'customers.json').write_text(json.dumps({'cust-1': legacy_customer}, indent=indent))
+    (tmp_path / 'jobs.json').write_text(json.dumps({'job-1': legacy_job}, indent=indent))
+
+    manager = BoatHaulingManager(make_store(tmp_path))
+    customer = manager.customers['cust-1']
+    assert customer.name == "Old Timer"
+    assert customer.boat_draft is None and customer.home_coordinates is None
+    assert manager.jobs['job-1'].scheduled_datetime == "2025-10-15 09:30"
+    assert [job.job_id for job in manager.jobs_for_customer('cust-1')] == ['job-1']
@@ -0,0 +1,183 @@
+import csv
+import glob
+import json
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# --- Configuration ---
+TIDE_FILE_PATTERN = '*_Tide_Times.csv'
+TIDE_CACHE_FILE = '.tide_cache.npz'
+TIDE_DATETIME_FORMAT = "%B %d, %Y %I:%M %p" # "January 1, 2025" + "10:12 AM"
+EPOCH = datetime(1970, 1, 1)
+HARBOR_SHIFT = 32 # Tides are keyed as (harbor number << 32) | epoch minute, so one array serves every harbor
+NO_TIDE = -1
+
+# Ramp access around high tide. A shallow boat gets the full window (Scituate town ramp: 3 hours either side
+# of high tide); every foot of draft beyond SHALLOW_DRAFT_FT costs WINDOW_LOSS_PER_FOOT_MINUTES per side.
+BASE_TIDE_WINDOW_MINUTES = 180
+SHALLOW_DRAFT_FT = 3.0
+WINDOW_LOSS_PER_FOOT_MINUTES = 30
+MIN_TIDE_WINDOW_MINUTES = 30
+SLOT_MINUTES = 30 # Transports start on the hour or half hour
+MAX_TIDE_GAP_MINUTES = 24 * 60 # Nearest tide further away than this means the table doesn't cover the date
+
+# --- Time Helpers ---
+# Tide tables are local wall-clock times, the same as Job.scheduled_datetime, so everything stays naive.
+def to_epoch_minutes(when):
+    return int((when - EPOCH).total_seconds() // 60)
+
+def from_epoch_minutes(minutes):
+    return EPOCH + timedelta(minutes=int(minutes))
+
+def datetime_strings_to_minutes(values):
+    """Vectorized "YYYY-MM-DD HH:MM" -> epoch minutes (numpy parses the ISO-style strings natively)."""
+    return np.asarray(values, dtype='datetime64[m]').astype(np.int64)
+
+# --- Tide Table ---
+class TideTable:
+    """High tides per harbor as sorted int64 epoch-minute arrays."""
+
+    def __init__(self, tides):
+        # tides: harbor name -> epoch minutes (any order)
+        self.harbors = tuple(sorted(tides))
+        self._codes = {h.lower(): code for code, h in enumerate(self.harbors)}
+        self._tides = {h: np.sort(np.asarray(tides[h], dtype=np.int64)) for h in self.harbors}
+        keyed = [self._tides[h] + (code << HARBOR_SHIFT) for code, h in enumerate(self.harbors)]
+        self._keyed = np.concatenate(keyed) if keyed else np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self._keyed)
+
+    # --- Loading ---
+    @classmethod
+    def load(cls, directory='.', cache_file=TIDE_CACHE_FILE):
+        """Parses every *_Tide_Times.csv in `directory`, reusing the binary cache while the CSVs are unchanged."""
+        paths = sorted(glob.glob(os.path.join(directory, TIDE_FILE_PATTERN)))
+        signature = json.dumps([[os.path.basename(p), os.stat(p).st_mtime_ns, os.path.getsize(p)] for p in paths])
+        cache_path = os.path.join(directory, cache_file)
+
+        cached = cls._read_cache(cache_path, signature)
+        if cached is not None:
+            return cached
+
+        tides = {}
+        for path in paths:
+            for harbor, minutes in parse_tide_csv(path).items():
+                tides.setdefault(harbor, []).extend(minutes)
+        table = cls(tides)
+        table._write_cache(cache_path, signature)
+        return table
+
+    @classmethod
+    def _read_cache(cls, cache_path, signature):
+        try:
+            with np.load(cache_path, allow_pickle=False) as cache:
+                if str(cache['signature']) != signature:
+                    return None
+                harbors = [str(h) for h in cache['harbors']]
+                return cls({h: cache[f"tides_{i}"] for i, h in enumerate(harbors)})
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def _write_cache(self, cache_path, signature):
+        arrays = {f"tides_{i}": self._tides[h] for i, h in enumerate(self.harbors)}
+        tmp_path = f"{cache_path}.tmp.npz"
+        try:
+            np.savez(tmp_path, signature=np.array(signature), harbors=np.array(self.harbors, dtype=str), **arrays)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass # The cache only saves parse time; a read-only checkout still works
+
+    # --- Lookups ---
+    def harbor_code(self, harbor):
+        """Index of `harbor` (case-insensitive) in self.harbors, or -1."""
+        return self._codes.get(str(harbor).strip().lower(), -1)
+
+    def harbor_for_location(self, location):
+        """First harbor named inside a free-text location such as "Scituate town ramp", else None."""
+        text = str(location).lower() if location else ''
+        for harbor in self.harbors:
+            if harbor.lower() in text:
+                return harbor
+        return None
+
+    def high_tides(self, harbor):
+        code = self.harbor_code(harbor)
+        return self._tides[self.harbors[code]] if code >= 0 else np.empty(0, dtype=np.int64)
+
+    def nearest_high_tide(self, harbor, when):
+        """The high tide closest to `when` at `harbor`, or None."""
+        nearest = self.nearest_high_tides([self.harbor_code(harbor)], [to_epoch_minutes(when)])[0]
+        return None if nearest == NO_TIDE else from_epoch_minutes(nearest)
+
+    def high_tides_between(self, harbor, start, end):
+        """High tides at `harbor` in [start, end), oldest first."""
+        tides = self.high_tides(harbor)
+        lo, hi = np.searchsorted(tides, [to_epoch_minutes(start), to_epoch_minutes(end)])
+        return [from_epoch_minutes(m) for m in tides[lo:hi]]
+
+    def nearest_high_tides(self, harbor_codes, when_minutes):
+        """Vectorized nearest high tide. harbor_codes and when_minutes are equal-length sequences
+        (codes from harbor_code(), may differ per row); returns epoch minutes, NO_TIDE where unknown."""
+        codes = np.asarray(harbor_codes, dtype=np.int64)
+        when = np.asarray(when_minutes, dtype=np.int64)
+        result = np.full(when.shape, NO_TIDE, dtype=np.int64)
+        known = codes >= 0
+        if not len(self._keyed) or not known.any():
+            return result
+
+        codes, when = codes[known], when[known]
+        keys = (codes << HARBOR_SHIFT) + when
+        pos = np.searchsorted(self._keyed, keys)
+        before = self._keyed[np.clip(pos - 1, 0, len(self._keyed) - 1)]
+        after = self._keyed[np.clip(pos, 0, len(self._keyed) - 1)]
+        # A neighbour only counts if it belongs to the same harbor
+        before_ok = (pos > 0) & ((before >> HARBOR_SHIFT) == codes)
+        after_ok = (pos < len(self._keyed)) & ((after >> HARBOR_SHIFT) == codes)
+        use_after = after_ok & (~before_ok | ((after - keys) < (keys - before)))
+        nearest = np.where(use_after, after, before)
+        found = before_ok | after_ok
+        result[np.flatnonzero(known)[found]] = nearest[found] & ((1 << HARBOR_SHIFT) - 1)
+        return result
+
+# --- Tide Window Feasibility ---
+def tide_window_minutes(drafts):
+    """Usable minutes either side of high tide for each boat draft (ft). Unknown (NaN) drafts get the full window."""
+    drafts = np.asarray(drafts, dtype=float)
+    excess = np.nan_to_num(np.maximum(drafts - SHALLOW_DRAFT_FT, 0.0), nan=0.0)
+    return np.clip(BASE_TIDE_WINDOW_MINUTES - excess * WINDOW_LOSS_PER_FOOT_MINUTES,
+                   MIN_TIDE_WINDOW_MINUTES, BASE_TIDE_WINDOW_MINUTES).astype(np.int64)
+
+def check_tide_windows(table, harbor_codes, when_minutes, drafts):
+    """Checks many ramp visits at once. Returns a dict of equal-length arrays:
+    high_tide (epoch minutes, NO_TIDE when the harbor or date has no data), window (minutes either side),
+    feasible (bool; True where there is no tide data to judge by) and suggested (nearest in-window
+    half-hour slot; equal to the requested time when feasible)."""
+    when = np.asarray(when_minutes, dtype=np.int64)
+    high_tide = table.nearest_high_tides(harbor_codes, when)
+    offset = when - high_tide
+    high_tide = np.where(np.abs(offset) <= MAX_TIDE_GAP_MINUTES, high_tide, NO_TIDE)
+    window = tide_window_minutes(drafts)
+    known = high_tide != NO_TIDE
+    feasible = ~known | (np.abs(offset) <= window)
+
+    # Clamp into the window, then round towards high tide so the slot stays inside it
+    opens, closes = high_tide - window, high_tide + window
+    early = offset < -window
+    suggested = np.where(early, -(-opens // SLOT_MINUTES) * SLOT_MINUTES, (closes // SLOT_MINUTES) * SLOT_MINUTES)
+    suggested = np.where(feasible, when, suggested)
+    return {'high_tide': high_tide, 'window': window, 'feasible': feasible, 'suggested': suggested}
+
+def parse_tide_csv(path):
+    """harbor -> [epoch minutes] from a Harbor,Date,High Tide CSV."""
+    tides = {}
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            try:
+                when = datetime.strptime(f"{row['Date'].strip()} {row['High Tide'].strip()}", TIDE_DATETIME_FORMAT)
+            except (KeyError, AttributeError, ValueError):
+                continue # Skip blank or malformed rows rather than losing the whole harbor
+            tides.setdefault(row['Harbor'].strip(), []).append(to_epoch_minutes(when))
+    return tides